@@ -0,0 +1,30 @@
+"""Index jobs for expiry cleanup
+
+Revision ID: 2d6a8f1c9e57
+Revises: 9b3e5d2a7c41
+Create Date: 2026-10-15 15:21:09.384116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d6a8f1c9e57'
+down_revision: Union[str, Sequence[str], None] = '9b3e5d2a7c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_job_expire_created', 'jobs', ['expires_at', 'created_at'], unique=False)
+    op.create_index('ix_jobs_created_at', 'jobs', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_created_at', table_name='jobs')
+    op.drop_index('ix_job_expire_created', table_name='jobs')
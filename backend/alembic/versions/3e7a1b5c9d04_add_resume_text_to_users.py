@@ -0,0 +1,28 @@
+"""Add resume_text to users
+
+Revision ID: 3e7a1b5c9d04
+Revises: e5b9f3a1d286
+Create Date: 2026-10-15 20:14:55.630419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7a1b5c9d04'
+down_revision: Union[str, Sequence[str], None] = 'e5b9f3a1d286'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('resume_text', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'resume_text')
@@ -0,0 +1,82 @@
+"""Move profile skills from a JSON text column into profile_skills
+
+Revision ID: 4f2a9c7d1e3b
+Revises: c1b1cd50458b
+Create Date: 2026-10-15 10:12:41.208514
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c7d1e3b'
+down_revision: Union[str, Sequence[str], None] = 'c1b1cd50458b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'profile_skills',
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills_master.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('profile_id', 'skill_id'),
+    )
+    op.create_index(op.f('ix_profile_skills_skill_id'), 'profile_skills', ['skill_id'], unique=False)
+
+    # Copy the JSON lists over; unreadable values were already treated as "no skills"
+    bind = op.get_bind()
+    links = []
+    for profile_id, raw in bind.execute(sa.text("SELECT id, skills FROM profiles WHERE skills IS NOT NULL")):
+        try:
+            names = json.loads(raw) if raw else []
+        except json.JSONDecodeError:
+            continue
+        for name in names:
+            if isinstance(name, str) and name.strip():
+                links.append({"profile_id": profile_id, "name": name.strip().lower()})
+
+    if links:
+        # Match existing SkillMaster rows case-insensitively; names with no
+        # match become unverified 'profile' rows the extractors ignore
+        bind.execute(
+            sa.text(
+                "INSERT INTO skills_master (name, source, is_verified) "
+                "SELECT DISTINCT n.name, 'profile', false FROM unnest(CAST(:names AS varchar[])) AS n(name) "
+                "WHERE NOT EXISTS (SELECT 1 FROM skills_master sm WHERE lower(sm.name) = n.name) "
+                "ON CONFLICT (name) DO NOTHING"
+            ),
+            {"names": sorted({link["name"] for link in links})},
+        )
+        bind.execute(
+            sa.text(
+                "INSERT INTO profile_skills (profile_id, skill_id) "
+                "SELECT :profile_id, id FROM skills_master WHERE lower(name) = :name "
+                "ORDER BY source IS NOT DISTINCT FROM 'profile', id LIMIT 1 "
+                "ON CONFLICT DO NOTHING"
+            ),
+            links,
+        )
+
+    op.drop_column('profiles', 'skills')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('profiles', sa.Column('skills', sa.Text(), nullable=True))
+    op.execute(
+        "UPDATE profiles SET skills = s.names FROM ("
+        " SELECT ps.profile_id, json_agg(sm.name ORDER BY sm.name)::text AS names"
+        " FROM profile_skills ps JOIN skills_master sm ON sm.id = ps.skill_id"
+        " GROUP BY ps.profile_id"
+        ") AS s WHERE s.profile_id = profiles.id"
+    )
+    op.drop_index(op.f('ix_profile_skills_skill_id'), table_name='profile_skills')
+    op.drop_table('profile_skills')
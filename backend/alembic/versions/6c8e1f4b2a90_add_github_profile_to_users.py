@@ -0,0 +1,30 @@
+"""Add github_profile and github_last_analyzed_at to users
+
+Revision ID: 6c8e1f4b2a90
+Revises: 2d6a8f1c9e57
+Create Date: 2026-10-15 16:40:52.117384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c8e1f4b2a90'
+down_revision: Union[str, Sequence[str], None] = '2d6a8f1c9e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('github_profile', sa.JSON(), nullable=True))
+    op.add_column('users', sa.Column('github_last_analyzed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'github_last_analyzed_at')
+    op.drop_column('users', 'github_profile')
@@ -0,0 +1,33 @@
+"""Make matches unique per (user_id, job_id)
+
+Revision ID: 9b3e5d2a7c41
+Revises: 4f2a9c7d1e3b
+Create Date: 2026-10-15 14:03:27.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5d2a7c41'
+down_revision: Union[str, Sequence[str], None] = '4f2a9c7d1e3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the newest row of any duplicated (user, job) pair
+    op.execute(
+        "DELETE FROM matches m USING matches newer"
+        " WHERE m.user_id = newer.user_id AND m.job_id = newer.job_id AND m.id < newer.id"
+    )
+    op.create_unique_constraint('uq_matches_user_job', 'matches', ['user_id', 'job_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_matches_user_job', 'matches', type_='unique')
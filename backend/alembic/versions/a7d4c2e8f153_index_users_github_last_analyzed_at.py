@@ -0,0 +1,28 @@
+"""Index users.github_last_analyzed_at
+
+Revision ID: a7d4c2e8f153
+Revises: 6c8e1f4b2a90
+Create Date: 2026-10-15 17:48:13.902256
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d4c2e8f153'
+down_revision: Union[str, Sequence[str], None] = '6c8e1f4b2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_users_github_last_analyzed_at'), 'users', ['github_last_analyzed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_github_last_analyzed_at'), table_name='users')
@@ -0,0 +1,38 @@
+"""Add source and proficiency to skills, indexed for per-source refreshes
+
+Revision ID: b8f2d6e4a719
+Revises: 3e7a1b5c9d04
+Create Date: 2026-10-15 21:02:18.446927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f2d6e4a719'
+down_revision: Union[str, Sequence[str], None] = '3e7a1b5c9d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('skills', sa.Column('source', sa.String(), nullable=True))
+    op.add_column('skills', sa.Column('proficiency', sa.String(), nullable=True))
+    # Existing rows came from the resume and GitHub endpoints; GitHub ones are prefixed
+    op.execute(
+        "UPDATE skills SET source = CASE WHEN name LIKE 'github\\_%' THEN 'github' ELSE 'resume' END"
+    )
+    op.create_index('ix_skill_user_source', 'skills', ['user_id', 'source'], unique=False)
+    op.create_index('ix_skill_user_name_source', 'skills', ['user_id', 'name', 'source'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_skill_user_name_source', table_name='skills')
+    op.drop_index('ix_skill_user_source', table_name='skills')
+    op.drop_column('skills', 'proficiency')
+    op.drop_column('skills', 'source')
@@ -0,0 +1,28 @@
+"""Index task_status on (status, completed_at)
+
+Revision ID: e5b9f3a1d286
+Revises: a7d4c2e8f153
+Create Date: 2026-10-15 19:26:40.771035
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9f3a1d286'
+down_revision: Union[str, Sequence[str], None] = 'a7d4c2e8f153'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_task_status_status_completed_at', 'task_status', ['status', 'completed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_status_status_completed_at', table_name='task_status')
@@ -0,0 +1,39 @@
+"""Add matched_at to matches so stale matches can be found
+
+Revision ID: f1c4a8e2b637
+Revises: b8f2d6e4a719
+Create Date: 2026-10-15 22:14:05.318270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c4a8e2b637'
+down_revision: Union[str, Sequence[str], None] = 'b8f2d6e4a719'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows get the migration time, so they first count as stale a week from now
+    op.add_column(
+        'matches',
+        sa.Column(
+            'matched_at',
+            sa.DateTime(),
+            server_default=sa.text("timezone('utc', now())"),
+            nullable=False,
+        ),
+    )
+    op.create_index('ix_matches_user_matched_at', 'matches', ['user_id', 'matched_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_matches_user_matched_at', table_name='matches')
+    op.drop_column('matches', 'matched_at')
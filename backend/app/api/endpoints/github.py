@@ -91,7 +91,7 @@ async def connect_github(
         ).delete()
 
         for sk in result["skills"]:
-            db.add(Skill(name=f"github_{sk}", user_id=current_user.id))
+            db.add(Skill(name=f"github_{sk}", user_id=current_user.id, source="github"))
         db.commit()
 
         save_profile_cache(db, current_user.id, result)
@@ -154,7 +154,7 @@ async def analyze_github_now(
             Skill.user_id == current_user.id, Skill.name.like("github_%")
         ).delete()
         for sk in result["skills"]:
-            db.add(Skill(name=f"github_{sk}", user_id=current_user.id))
+            db.add(Skill(name=f"github_{sk}", user_id=current_user.id, source="github"))
         db.commit()
 
         save_profile_cache(db, current_user.id, result)
@@ -175,11 +175,10 @@ async def get_github_skills(
     GitHub-derived skills (prefixed github_ in DB; prefix removed in response).
     """
     rows = (
-        db.query(Skill)
+        db.query(Skill.name)
         .filter(Skill.user_id == current_user.id, Skill.name.like("github_%"))
-        .all()
     )
-    skills = [r.name.replace("github_", "") for r in rows]
+    skills = [name.replace("github_", "") for (name,) in rows]
     return {
         "skills": skills,
         "total": len(skills),
@@ -194,15 +193,15 @@ async def get_all_user_skills(
     """
     Resume + GitHub combined (simple union/intersection).
     """
-    rows = db.query(Skill).filter(Skill.user_id == current_user.id).all()
+    rows = db.query(Skill.name).filter(Skill.user_id == current_user.id)
     resume_skills: List[str] = []
     github_skills: List[str] = []
 
-    for s in rows:
-        if s.name.startswith("github_"):
-            github_skills.append(s.name.replace("github_", ""))
+    for (name,) in rows:
+        if name.startswith("github_"):
+            github_skills.append(name.replace("github_", ""))
         else:
-            resume_skills.append(s.name)
+            resume_skills.append(name)
 
     common = sorted(list(set(resume_skills) & set(github_skills)))
     all_unique = sorted(list(set(resume_skills + github_skills)))
@@ -4,6 +4,7 @@ from app.db.session import get_db
 from app.core.dependencies import get_current_active_user
 from app.services.job_scraper import JobScraperService
 from app.tasks.job_scraping_tasks import scrape_all_jobs_task, scrape_specific_source_task
+from app.tasks.matching_tasks import invalidate_job_count
 from app.db.models import Job, User
 from datetime import datetime
 from sqlalchemy import func
@@ -178,6 +179,9 @@ async def test_scraper_direct(
         else:
             raise HTTPException(status_code=400, detail="Invalid source")
         
+        if count > 0:
+            invalidate_job_count()
+        
         return {
             "message": f"Successfully scraped {count} jobs from {source}",
             "source": source,
@@ -208,6 +212,8 @@ async def cleanup_duplicate_jobs(
     """))
     
     db.commit()
+    if result.rowcount:
+        invalidate_job_count()
     
     return {
         "message": "Duplicate jobs cleaned up",
@@ -1,5 +1,6 @@
 from app.core.cache import cache_get, cache_set, cache_delete
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional
 from pydantic import BaseModel
@@ -76,7 +77,7 @@ def _compute_matches(db: Session, current_user: User) -> List[Dict]:
 
     if not matches:
         from app.db.models import Skill
-        user_skills = db.query(Skill).filter(Skill.user_id == current_user.id).count()
+        user_skills = db.query(func.count(Skill.id)).filter(Skill.user_id == current_user.id).scalar()
         if user_skills == 0:
             raise HTTPException(
                 status_code=400,
@@ -214,16 +215,17 @@ async def debug_user_skills(
     """
     from app.db.models import Skill
     
-    skills = db.query(Skill).filter(Skill.user_id == current_user.id).all()
+    # names only; no Skill objects are hydrated
+    skills = [name for (name,) in db.query(Skill.name).filter(Skill.user_id == current_user.id)]
     
     resume_skills = []
     github_skills = []
     
-    for skill in skills:
-        if skill.name.startswith('github_'):
-            github_skills.append(skill.name.replace('github_', ''))
+    for name in skills:
+        if name.startswith('github_'):
+            github_skills.append(name.replace('github_', ''))
         else:
-            resume_skills.append(skill.name)
+            resume_skills.append(name)
     
     return {
         "user_id": current_user.id,
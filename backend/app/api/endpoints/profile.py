@@ -1,7 +1,6 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-import json
 
 from app.db.session import get_db
 from app.core.dependencies import get_current_user, get_current_active_user
@@ -38,6 +37,7 @@ async def get_my_profile(
     
     profile_data = profile.__dict__
     profile_data['email'] = current_user.email
+    profile_data['skills'] = profile_service.get_skill_names(db, profile.id)
     return ProfileResponse(**profile_data)
 
 @router.put("/me", response_model=ProfileResponse)
@@ -50,6 +50,7 @@ async def update_my_profile(
     profile = profile_service.update_profile(db, current_user.id, profile_data)
     profile_data = profile.__dict__
     profile_data['email'] = current_user.email
+    profile_data['skills'] = profile_service.get_skill_names(db, profile.id)
     return ProfileResponse(**profile_data)
 
 @router.post("/skills", response_model=ProfileResponse)
@@ -68,6 +69,7 @@ async def add_skills(
     profile = profile_service.add_skills(db, current_user.id, skills_data.skills)
     profile_data = profile.__dict__
     profile_data['email'] = current_user.email
+    profile_data['skills'] = profile_service.get_skill_names(db, profile.id)
     return ProfileResponse(**profile_data)
 
 @router.delete("/skills/{skill}")
@@ -107,7 +109,7 @@ async def get_user_profile(
         "title": profile.title,
         "bio": profile.bio,
         "location": profile.location,
-        "skills": json.loads(profile.skills) if profile.skills else [],
+        "skills": profile_service.get_skill_names(db, profile.id),
         "linkedin_url": profile.linkedin_url,
         "github_username": profile.github_username
     }
@@ -5,7 +5,6 @@ from app.db.models import User, Skill
 from app.core.dependencies import get_current_active_user
 from app.services.resume_parser import extract_text_from_pdf
 from app.services.skill_extractor import extract_skills, clean_skills, save_new_skills
-import shutil
 import os
 
 router = APIRouter(prefix="/resume", tags=["resume"])
@@ -20,10 +19,12 @@ async def upload_resume(
     current_user: User = Depends(get_current_active_user),
 ):
     file_path = os.path.join(UPLOAD_DIR, f"{current_user.id}_{file.filename}")
+    content = await file.read()
+    # the copy on disk is only kept for /reparse; parse the bytes in memory
     with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+        buffer.write(content)
 
-    text = extract_text_from_pdf(file_path)
+    text = extract_text_from_pdf(content)
     raw_skills = extract_skills(text, db)
     skills = clean_skills(raw_skills)  
 
@@ -31,7 +32,7 @@ async def upload_resume(
     db.commit()
 
     db.query(Skill).filter(Skill.user_id == current_user.id).delete()
-    db.add_all([Skill(name=s, user_id=current_user.id) for s in skills])
+    db.add_all([Skill(name=s, user_id=current_user.id, source="resume") for s in skills])
     db.commit()
 
 
@@ -51,6 +52,6 @@ def reparse_resume(
     text = extract_text_from_pdf(current_user.resume_path)
     skills = clean_skills(extract_skills(text, db))
     db.query(Skill).filter(Skill.user_id == current_user.id).delete()
-    db.add_all([Skill(name=s, user_id=current_user.id) for s in skills])
+    db.add_all([Skill(name=s, user_id=current_user.id, source="resume") for s in skills])
     db.commit()
     return {"message": "Reparsed successfully", "skills": skills}
@@ -1,5 +1,11 @@
+import logging
+
 from celery import Celery
+from celery.signals import celeryd_after_setup, task_postrun, worker_process_init
 from app.core.config import settings
+from app.db.session import TaskSession, engine
+
+logger = logging.getLogger(__name__)
 
 # Create Celery instance
 celery_app = Celery(
@@ -9,7 +15,8 @@ celery_app = Celery(
     include=[
         "app.tasks.resume_tasks",
         "app.tasks.github_tasks",
-        "app.tasks.matching_tasks"
+        "app.tasks.matching_tasks",
+        "app.tasks.job_scraping_tasks"
     ]
 )
 
@@ -25,19 +32,71 @@ celery_app.conf.update(
     task_time_limit=300,  # 5 minutes max per task
     task_soft_time_limit=240,  # Soft limit at 4 minutes
     worker_prefetch_multiplier=1,  # Don't prefetch tasks
-    worker_max_tasks_per_child=1000,  # Restart worker after 1000 tasks
+    worker_max_tasks_per_child=10000,  # Recycle rarely; each restart re-warms the parser
 )
 
-# Task routing (optional)
+# Task routing by duration and resource profile, so a multi-minute GitHub
+# analysis never sits ahead of a seconds-long cleanup on the same worker:
+#   fast               - schedulers, fan-outs and housekeeping (prefork)
+#   io                 - network-bound GitHub/API calls (threads pool)
+#   matching           - CPU-bound scoring (prefork)
+#   resume_processing  - PDF parsing and skill extraction (prefork, own worker)
+# Tasks are registered under explicit names, so routes key on those names.
+celery_app.conf.task_default_queue = "fast"
 celery_app.conf.task_routes = {
-    "app.tasks.resume_tasks.*": {"queue": "resume_processing"},
-    "app.tasks.github_tasks.*": {"queue": "github_processing"},
-    "app.tasks.matching_tasks.*": {"queue": "matching"},
+    "process_resume": {"queue": "resume_processing"},
+    "analyze_github": {"queue": "io"},
+    "scrape_specific_source": {"queue": "io"},
+    "match_users_chunk": {"queue": "matching"},
+    "match_single_user": {"queue": "matching"},
 }
 
 # Rate limits for external API calls
 celery_app.conf.task_annotations = {
-    "app.tasks.github_tasks.analyze_github_profile": {
+    "analyze_github": {
         "rate_limit": "10/m"  # 10 per minute for GitHub API
     }
-}
\ No newline at end of file
+}
+
+
+@worker_process_init.connect
+def _reset_db_pool(**_):
+    """Forked children must not reuse the parent's pooled connections."""
+    engine.dispose(close=False)
+
+
+# Set in the worker's main process before it forks, so prefork children inherit it
+_consumes_resume_queue = False
+
+
+@celeryd_after_setup.connect
+def _note_worker_queues(sender, instance, **_):
+    """Record whether this worker consumes resume_processing (from -Q, or all queues)."""
+    global _consumes_resume_queue
+    _consumes_resume_queue = "resume_processing" in instance.app.amqp.queues.consume_from
+
+
+@worker_process_init.connect
+def _warm_resume_parser(**_):
+    """
+    Load the SkillMaster vocabulary, build its Aho-Corasick automaton and
+    initialize PyMuPDF before the first resume task needs them. Workers
+    that don't take resume tasks skip it and never import that stack.
+    """
+    if not _consumes_resume_queue:
+        return
+    # imported here so the API process, which also imports this module,
+    # doesn't pull in the extraction stack
+    from app.services import resume_parser
+    try:
+        resume_parser.warm_up(TaskSession())
+    except Exception as e:
+        logger.warning(f"Resume parser warm-up failed: {e}")
+    finally:
+        TaskSession.remove()
+
+
+@task_postrun.connect
+def _release_task_session(**_):
+    """Safety net: return the task's session to the pool even if the task forgot."""
+    TaskSession.remove()
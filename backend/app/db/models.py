@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float, DateTime, Boolean, JSON, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float, DateTime, Boolean, JSON, func, UniqueConstraint, Index
 from enum import Enum
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
@@ -27,6 +27,11 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     github_username = Column(String, unique=True, nullable=True)
     resume_path = Column(String, nullable=True)
+    resume_text = Column(Text, nullable=True)  # first 5000 chars of the parsed resume
+    # GitHub summary, rewritten only when its content changes; the
+    # per-run timestamp lives in its own column
+    github_profile = Column(JSON, nullable=True)
+    github_last_analyzed_at = Column(DateTime, nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
     skills = relationship("Skill", back_populates="user")
@@ -36,16 +41,29 @@ class User(Base):
 
 class Skill(Base):
     __tablename__ = "skills"
+    # resume/GitHub refreshes delete by (user_id, source) and the resume
+    # insert probes (user_id, name, source)
+    __table_args__ = (
+        Index("ix_skill_user_source", "user_id", "source"),
+        Index("ix_skill_user_name_source", "user_id", "name", "source"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    source = Column(String, nullable=True)  # resume, github, manual
+    proficiency = Column(String, nullable=True)
 
     user = relationship("User", back_populates="skills")
 
 
 class Job(Base):
     __tablename__ = "jobs"
+    # cleanup_expired_jobs filters on expires_at OR created_at
+    __table_args__ = (
+        Index("ix_job_expire_created", "expires_at", "created_at"),
+        Index("ix_jobs_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -71,11 +89,19 @@ class Job(Base):
 
 class Match(Base):
     __tablename__ = "matches"
+    # one row per (user, job) so re-matching can upsert scores in place;
+    # refresh_stale_matches reads max(matched_at) per user
+    __table_args__ = (
+        UniqueConstraint("user_id", "job_id", name="uq_matches_user_job"),
+        Index("ix_matches_user_matched_at", "user_id", "matched_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     job_id = Column(Integer, ForeignKey("jobs.id"))
     score = Column(Float, nullable=False)
+    # UTC time of the last (re)match; the upsert in JobMatcher resets it
+    matched_at = Column(DateTime, nullable=False, server_default=func.timezone("utc", func.now()))
 
     user = relationship("User", back_populates="matches")
     job = relationship("Job", back_populates="matches")
@@ -92,6 +118,8 @@ class SkillMaster(Base):
 class TaskStatus(Base):
     """Track background task status"""
     __tablename__ = "task_status"
+    # cleanup_old_tasks filters on status + completed_at
+    __table_args__ = (Index("ix_task_status_status_completed_at", "status", "completed_at"),)
     
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(String, unique=True, index=True)  # Celery task ID
@@ -124,8 +152,6 @@ class Profile(Base):
     resume_path = Column(String(500), nullable=True)
     resume_uploaded_at = Column(DateTime(timezone=True), nullable=True)
     
-    skills = Column(Text, nullable=True)  
-    
     is_complete = Column(Boolean, default=False)
     completion_percentage = Column(Integer, default=0)
     
@@ -134,8 +160,10 @@ class Profile(Base):
     
     user = relationship("User", back_populates="profile")
     
-    def calculate_completion(self):
-        """Calculate profile completion percentage"""
+    COMPLETE_THRESHOLD = 80  # percent
+
+    def calculate_completion(self, has_skills: bool = False):
+        """Return (completion percentage, is_complete); skills live in profile_skills"""
         fields = [
             self.full_name,
             self.phone,
@@ -144,7 +172,16 @@ class Profile(Base):
             self.bio,
             self.linkedin_url,
             self.resume_path,
-            self.skills
+            has_skills
         ]
         filled = sum(1 for field in fields if field)
-        return int((filled / len(fields)) * 100)
+        percentage = int((filled / len(fields)) * 100)
+        return percentage, percentage >= self.COMPLETE_THRESHOLD
+
+
+class ProfileSkill(Base):
+    """Skills on a profile, one row per (profile, SkillMaster entry)."""
+    __tablename__ = "profile_skills"
+
+    profile_id = Column(Integer, ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills_master.id", ondelete="CASCADE"), primary_key=True, index=True)
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal, engine
-from app.db.models import Job, Base
+from app.db.models import Job, JobTypeEnum, Base
 from datetime import datetime, timedelta
 import random
 import logging
@@ -299,33 +299,26 @@ def seed_jobs(db: Session = None):
             logger.info(f"Jobs already seeded. Found {existing_count} jobs.")
             return existing_count
         
-        # Add jobs
-        added_count = 0
-        for i, job_data in enumerate(SAMPLE_JOBS, 1):
-            # Create job
-            job = Job(
+        # Build plain row dicts and insert them in one bulk statement
+        rows = []
+        for job_data in SAMPLE_JOBS:
+            row = dict(
                 title=job_data["title"],
                 company=job_data["company"],
                 location=job_data["location"],
                 description=job_data["description"],
                 required_skills=job_data["required_skills"],
                 url=job_data["url"],
+                job_type=JobTypeEnum.FULL_TIME,
                 created_at=datetime.utcnow() - timedelta(days=random.randint(1, 30))
             )
             
             # Add optional fields if they exist
-            if "remote" in job_data:
-                job.remote = job_data["remote"]
-            if "salary_min" in job_data:
-                job.salary_min = job_data["salary_min"]
-            if "salary_max" in job_data:
-                job.salary_max = job_data["salary_max"]
+            for field in ("remote", "salary_min", "salary_max"):
+                if field in job_data:
+                    row[field] = job_data[field]
             
-            db.add(job)
-            added_count += 1
-            
-            if added_count % 5 == 0:
-                logger.info(f"Added {added_count} jobs...")
+            rows.append(row)
         
         # Add more variations by slightly modifying existing jobs
         variations = [
@@ -335,26 +328,32 @@ def seed_jobs(db: Session = None):
         for prefix, salary_multiplier in variations:
             for job_data in SAMPLE_JOBS[:10]:  # Create variations of first 10 jobs
                 if "Junior" not in job_data["title"] and "Senior" not in job_data["title"]:
-                    job = Job(
+                    row = dict(
                         title=f"{prefix} {job_data['title']}",
                         company=f"{job_data['company']} ({prefix})",
                         location=job_data["location"],
                         description=f"{prefix} position. {job_data['description']}",
                         required_skills=job_data["required_skills"],
                         url=f"{job_data['url']}-{prefix.lower()}",
+                        job_type=JobTypeEnum.FULL_TIME,
                         created_at=datetime.utcnow() - timedelta(days=random.randint(1, 30))
                     )
                     
                     if "salary_min" in job_data:
-                        job.salary_min = int(job_data["salary_min"] * salary_multiplier)
+                        row["salary_min"] = int(job_data["salary_min"] * salary_multiplier)
                     if "salary_max" in job_data:
-                        job.salary_max = int(job_data["salary_max"] * salary_multiplier)
+                        row["salary_max"] = int(job_data["salary_max"] * salary_multiplier)
                     
-                    db.add(job)
-                    added_count += 1
+                    rows.append(row)
         
+        db.bulk_insert_mappings(Job, rows)
+        added_count = len(rows)
         db.commit()
         
+        # imported here so seeding doesn't load the Celery app up front
+        from app.tasks.matching_tasks import invalidate_job_count
+        invalidate_job_count()
+        
         logger.info(f"✅ Successfully added {added_count} jobs to the database")
         
         # Show some statistics
@@ -1,22 +1,91 @@
+import heapq
 import os
 import re
+import sys
+import time
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlencode
 
+import ciso8601
+import orjson
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.cache import cache_manager
 from app.db.models import SkillMaster
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Skills inferred from repo name/description/topics, compiled once
+_REPO_SKILL_PATTERNS = tuple(
+    (label, re.compile(pat))
+    for label, pat in {
+        "react": r"\breact\b",
+        "angular": r"\bangular\b",
+        "vue": r"\bvue\b",
+        "fastapi": r"\bfastapi\b",
+        "flask": r"\bflask\b",
+        "django": r"\bdjango\b",
+        "express": r"\bexpress\b",
+        "spring": r"\bspring\b",
+        "docker": r"\bdocker\b",
+        "kubernetes": r"\bkubernetes\b|k8s",
+        "graphql": r"\bgraphql\b",
+        "mongodb": r"\bmongodb\b|mongo",
+        "postgresql": r"\bpostgresql\b|\bpostgres\b",
+        "redis": r"\bredis\b",
+        "ci/cd": r"ci\/cd|continuous integration",
+        "microservices": r"\bmicroservices?\b",
+        "aws": r"\baws\b|amazon web services",
+        "machine learning": r"machine[\s-]?learning|ml",
+    }.items()
+)
+
+# Owned, non-fork repos with per-repo language byte sizes, 100 per request
+_REPOS_QUERY = """
+query($login: String!, $cursor: String) {
+  user(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, isFork: false,
+                 orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name description url updatedAt stargazerCount forkCount
+        primaryLanguage { name }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        languages(first: 20, orderBy: {field: SIZE, direction: DESC}) {
+          edges { size node { name } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+class RateLimitExceeded(Exception):
+    """GitHub returned 403 with no remaining rate-limit budget."""
+
+    def __init__(self, reset_at: Optional[datetime] = None):
+        self.reset_at = reset_at
+        super().__init__(f"GitHub rate limit exceeded (resets at {reset_at})")
+
 
 class GitHubAnalyzer:
+    # SkillMaster lookup shared by every analyzer in the process
+    _known_skills_cache: Optional[Dict[str, str]] = None
+    _known_skills_set: frozenset = frozenset()
+    _known_skills_loaded_at: float = 0.0
+    SKILLS_CACHE_TTL = 3600  # seconds
+    ETAG_CACHE_TTL = 86400  # seconds
+
     def __init__(self, db: Session):
         self.db = db
         self.base_url = "https://api.github.com"
@@ -39,6 +108,10 @@ class GitHubAnalyzer:
         )
         self.session.mount("https://", HTTPAdapter(max_retries=retry))
 
+        # url -> {"etag": ..., "body": ...} for conditional requests
+        self._etag_cache: Dict[str, Dict[str, Any]] = {}
+        self.rate_limited = False
+
         # Load canonical skills once
         self._load_skills()
 
@@ -48,25 +121,21 @@ class GitHubAnalyzer:
     def analyze_profile(self, username: str) -> Dict:
         """Analyze a GitHub profile and extract skills."""
         try:
-            user_info = self._get_user_info(username)
-            if not user_info:
-                raise ValueError(f"GitHub user {username} not found")
-
-            repos = self._get_repositories(username)
+            user_info, repos = self._fetch_profile_and_repos(username)
             languages = self._analyze_languages(repos)
             repo_skills = self._extract_skills_from_repos(repos, username)
-            top_repos = self._get_top_repositories(repos)
-            activity_score = self._calculate_activity_score(repos, user_info)
+            stats = self._aggregate_repos(repos)
+            top_repos = self._get_top_repositories(stats)
+            activity_score = self._calculate_activity_score(stats, user_info)
 
             # Combine skills (languages + repo-derived)
             all_skills = set(languages.keys()) | set(repo_skills)
 
-            # Map to known skills in DB (case-insensitive)
-            matched_skills: List[str] = []
-            for s in all_skills:
-                key = s.lower()
-                if key in self.known_skills:
-                    matched_skills.append(self.known_skills[key])
+            # Map to known skills in DB (case-insensitive); the set dedupes
+            all_skills_lower = {s.lower() for s in all_skills}
+            matched_skills = sorted(
+                {self.known_skills[k] for k in all_skills_lower & self.known_skills_set}
+            )
 
             result = {
                 "username": username,
@@ -82,11 +151,12 @@ class GitHubAnalyzer:
                     "avatar_url": user_info.get("avatar_url", ""),
                 },
                 "languages": languages,  # {lang: count_of_repos_using_it}
-                "skills": sorted(list(set(matched_skills))),
+                "skills": matched_skills,
                 "top_repositories": top_repos[:10],  # simplified payload
                 "activity_score": activity_score,
-                "total_stars": sum(r.get("stargazers_count", 0) for r in repos),
-                "total_forks": sum(r.get("forks_count", 0) for r in repos),
+                "total_stars": stats["total_stars"],
+                "total_forks": stats["total_forks"],
+                "rate_limited": self.rate_limited,
             }
             return result
 
@@ -94,51 +164,222 @@ class GitHubAnalyzer:
             logger.error(f"Error analyzing GitHub profile {username}: {str(e)}")
             raise
 
+    def analyze_user(self, username: str) -> Dict:
+        """
+        Summary consumed by the background GitHub task: language shares by
+        bytes of code, repo-derived frameworks and headline counts.
+        """
+        user_info, repos = self._fetch_profile_and_repos(username)
+
+        # Byte sizes come from GraphQL; REST listings only carry the primary
+        # language, so fall back to weighting each language by repo count
+        sizes: Dict[str, int] = {}
+        for repo in repos:
+            by_lang = repo.get("_language_bytes") or (
+                {repo["language"]: 1} if repo.get("language") else {}
+            )
+            for lang, size in by_lang.items():
+                sizes[lang] = sizes.get(lang, 0) + size
+
+        total = sum(sizes.values()) or 1
+        languages = {
+            lang: {"bytes": size, "percentage": round(size * 100 / total, 1)}
+            for lang, size in sorted(sizes.items(), key=lambda x: x[1], reverse=True)
+        }
+
+        repo_skills = {s.lower() for s in self._extract_skills_from_repos(repos, username)}
+        frameworks = sorted(
+            {self.known_skills[k] for k in repo_skills & self.known_skills_set}
+        )
+        stats = self._aggregate_repos(repos)
+
+        return {
+            "username": username,
+            "repos_count": len(repos),
+            "total_stars": stats["total_stars"],
+            "followers": user_info.get("followers", 0),
+            "languages": languages,
+            "top_languages": list(languages)[:5],
+            "frameworks": frameworks,
+            "rate_limited": self.rate_limited,
+        }
+
     # ------------------------
     # Internals
     # ------------------------
-    def _load_skills(self):
-        """Load skills from SkillMaster as canonical set."""
-        skills = self.db.query(SkillMaster.name).all()
-        # map lower -> canonical
-        self.known_skills = {row[0].strip().lower(): row[0].strip() for row in skills if row and row[0]}
-        logger.info(f"Loaded {len(self.known_skills)} skills for matching")
+    @classmethod
+    def reload_skills(cls):
+        """Drop the shared SkillMaster cache; the next analyzer reloads it."""
+        cls._known_skills_cache = None
 
-    def _get(self, url: str, **kwargs):
-        return self.session.get(url, headers=self.headers, timeout=10, **kwargs)
-
-    def _get_user_info(self, username: str) -> Optional[Dict]:
-        r = self._get(f"{self.base_url}/users/{username}")
+    def _load_skills(self):
+        """Load skills from SkillMaster as canonical set (cached per process)."""
+        cls = type(self)
+        expired = time.monotonic() - cls._known_skills_loaded_at > cls.SKILLS_CACHE_TTL
+        if cls._known_skills_cache is None or expired:
+            # profile-only rows are user free text, not extraction vocabulary
+            stmt = select(SkillMaster.name).where(SkillMaster.source.is_distinct_from("profile"))
+            names = self.db.execute(stmt).scalars().all()
+            # map lower -> canonical
+            cls._known_skills_cache = {n.strip().lower(): n.strip() for n in names if n}
+            cls._known_skills_set = frozenset(cls._known_skills_cache)
+            cls._known_skills_loaded_at = time.monotonic()
+            logger.info(f"Loaded {len(cls._known_skills_cache)} skills for matching")
+        self.known_skills = cls._known_skills_cache
+        # membership-only lookups use the shared immutable set
+        self.known_skills_set = cls._known_skills_set
+
+    def _get_json(self, url: str, params: Optional[Dict] = None) -> Optional[Any]:
+        """
+        GET a JSON resource, revalidating with If-None-Match.
+        GitHub answers unchanged resources with 304, which does not count
+        against the rate limit. Returns None on 404.
+        """
+        key = f"{url}?{urlencode(params)}" if params else url
+        cached = self._etag_cache.get(key) or cache_manager.get(f"github:etag:{key}")
+
+        headers = dict(self.headers)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+
+        r = self.session.get(url, headers=headers, params=params, timeout=10)
+        if r.status_code == 304 and cached:
+            return cached["body"]
         if r.status_code == 404:
             return None
+        if r.status_code == 403 and r.headers.get("X-RateLimit-Remaining") == "0":
+            reset = r.headers.get("X-RateLimit-Reset")
+            reset_at = datetime.fromtimestamp(int(reset)) if reset else None
+            logger.warning(f"GitHub rate limit exhausted; resets at {reset_at}")
+            raise RateLimitExceeded(reset_at)
         r.raise_for_status()
-        return r.json()
+
+        body = orjson.loads(r.content)
+        etag = r.headers.get("ETag")
+        if etag:
+            entry = {"etag": etag, "body": body}
+            self._etag_cache[key] = entry
+            cache_manager.set(f"github:etag:{key}", entry, ttl=self.ETAG_CACHE_TTL)
+        return body
+
+    def _fetch_profile_and_repos(self, username: str) -> Tuple[Dict, List[Dict]]:
+        """
+        Fetch the profile and the repo list. They are independent requests,
+        so overlap them instead of paying two round trips back to back.
+        """
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            info_future = pool.submit(self._get_user_info, username)
+            repos_future = pool.submit(self._get_repositories, username)
+            user_info = info_future.result()
+            if not user_info:
+                raise ValueError(f"GitHub user {username} not found")
+            return user_info, repos_future.result()
+
+    def _get_user_info(self, username: str) -> Optional[Dict]:
+        return self._get_json(f"{self.base_url}/users/{username}")
 
     def _get_repositories(self, username: str) -> List[Dict]:
-        """Fetch repositories quickly: skip forks, limit pages."""
+        """
+        Fetch repositories quickly: skip forks, limit pages. With a token a
+        single GraphQL request returns 100 repos together with their
+        language sizes; otherwise use the REST listing.
+        """
+        if self.token:
+            repos = self._get_repositories_graphql(username)
+            if repos is not None:
+                return repos
+
         repos: List[Dict] = []
         page = 1
         while True:
-            r = self._get(
-                f"{self.base_url}/users/{username}/repos",
-                params={"page": page, "per_page": 100, "sort": "updated"},
-            )
-            r.raise_for_status()
-            data = r.json()
+            try:
+                data = self._get_json(
+                    f"{self.base_url}/users/{username}/repos",
+                    params={"page": page, "per_page": 100, "sort": "updated"},
+                )
+            except RateLimitExceeded:
+                if not repos:
+                    raise
+                # Keep what we already have instead of burning more requests
+                self.rate_limited = True
+                break
             if not data:
                 break
+            last_page = len(data) < 100
 
             # Skip forks to reduce noise and calls
-            data = [d for d in data if not d.get("fork")]
-            repos.extend(data)
+            repos.extend(self._prepare_repo(d) for d in data if not d.get("fork"))
 
-            # Hard limits to keep analysis snappy
-            if page >= 2 or len(repos) >= 200:
+            # Hard limits to keep analysis snappy; a short page is the last one
+            if last_page or page >= 2 or len(repos) >= 200:
                 break
             page += 1
 
         return repos
 
+    def _get_repositories_graphql(self, username: str) -> Optional[List[Dict]]:
+        """
+        Same repo list as the REST path, shaped like REST repo objects plus
+        "_language_bytes". Returns None if GraphQL is unusable, so the caller
+        falls back to REST.
+        """
+        repos: List[Dict] = []
+        cursor = None
+        for _ in range(2):  # same 200-repo cap as the REST path
+            r = self.session.post(
+                f"{self.base_url}/graphql",
+                headers=self.headers,
+                json={"query": _REPOS_QUERY, "variables": {"login": username, "cursor": cursor}},
+                timeout=15,
+            )
+            if r.status_code == 403 and r.headers.get("X-RateLimit-Remaining") == "0":
+                if repos:
+                    self.rate_limited = True
+                    break
+                reset = r.headers.get("X-RateLimit-Reset")
+                raise RateLimitExceeded(datetime.fromtimestamp(int(reset)) if reset else None)
+            if r.status_code != 200:
+                logger.warning(f"GitHub GraphQL returned {r.status_code}; using REST")
+                return None
+
+            payload = orjson.loads(r.content)
+            user = (payload.get("data") or {}).get("user")
+            if user is None:
+                if payload.get("errors"):
+                    logger.warning(f"GitHub GraphQL errors: {payload['errors'][:1]}")
+                return None
+
+            conn = user["repositories"]
+            for node in conn["nodes"]:
+                repos.append(self._prepare_repo({
+                    "name": node["name"],
+                    "description": node.get("description"),
+                    "html_url": node["url"],
+                    "updated_at": node.get("updatedAt"),
+                    "stargazers_count": node.get("stargazerCount", 0),
+                    "forks_count": node.get("forkCount", 0),
+                    "fork": False,
+                    "language": (node.get("primaryLanguage") or {}).get("name"),
+                    "topics": [t["topic"]["name"] for t in node["repositoryTopics"]["nodes"]],
+                    "_language_bytes": {
+                        e["node"]["name"]: e["size"] for e in node["languages"]["edges"]
+                    },
+                }))
+
+            if not conn["pageInfo"]["hasNextPage"]:
+                break
+            cursor = conn["pageInfo"]["endCursor"]
+
+        return repos
+
+    @staticmethod
+    def _prepare_repo(d: Dict) -> Dict:
+        """Lowercase once here; topics are a small closed vocabulary, so intern them."""
+        d["_name_l"] = (d.get("name") or "").lower()
+        d["_desc_l"] = (d.get("description") or "").lower()
+        d["topics"] = [sys.intern(t.lower()) for t in (d.get("topics") or [])]
+        return d
+
     def _analyze_languages(self, repos: List[Dict]) -> Dict[str, int]:
         """Count how many repos use each primary language."""
         stats: Dict[str, int] = {}
@@ -152,36 +393,14 @@ class GitHubAnalyzer:
     def _extract_skills_from_repos(self, repos: List[Dict], username: str) -> Set[str]:
         """Find skills from repo name/description/topics (no heavy file calls)."""
         skills: Set[str] = set()
-        patterns = {
-            "react": r"\breact\b",
-            "angular": r"\bangular\b",
-            "vue": r"\bvue\b",
-            "fastapi": r"\bfastapi\b",
-            "flask": r"\bflask\b",
-            "django": r"\bdjango\b",
-            "express": r"\bexpress\b",
-            "spring": r"\bspring\b",
-            "docker": r"\bdocker\b",
-            "kubernetes": r"\bkubernetes\b|k8s",
-            "graphql": r"\bgraphql\b",
-            "mongodb": r"\bmongodb\b|mongo",
-            "postgresql": r"\bpostgresql\b|\bpostgres\b",
-            "redis": r"\bredis\b",
-            "ci/cd": r"ci\/cd|continuous integration",
-            "microservices": r"\bmicroservices?\b",
-            "aws": r"\baws\b|amazon web services",
-            "machine learning": r"machine[\s-]?learning|ml",
-        }
 
         # Limit scanned repos to keep performance predictable
         for repo in repos[:100]:
-            name = (repo.get("name") or "").lower()
-            desc = (repo.get("description") or "").lower()
-            topics = [t.lower() for t in (repo.get("topics") or [])]
-            combined = f"{name} {desc} {' '.join(topics)}"
+            topics = repo["topics"]
+            combined = f"{repo['_name_l']} {repo['_desc_l']} {' '.join(topics)}"
 
-            for label, pat in patterns.items():
-                if re.search(pat, combined):
+            for label, pat in _REPO_SKILL_PATTERNS:
+                if label not in skills and pat.search(combined):
                     skills.add(label)
 
             for t in topics:
@@ -194,32 +413,56 @@ class GitHubAnalyzer:
 
         return skills
 
-    def _get_top_repositories(self, repos: List[Dict]) -> List[Dict]:
-        """Score and select top repos (lightweight)."""
+    def _updated_at(self, repo: Dict) -> Optional[datetime]:
+        """Parse repo["updated_at"] once and cache it on the repo dict."""
+        if "_updated_dt" not in repo:
+            raw = repo.get("updated_at")
+            repo["_updated_dt"] = ciso8601.parse_datetime(raw) if raw else None
+        return repo["_updated_dt"]
+
+    def _aggregate_repos(self, repos: List[Dict]) -> Dict[str, Any]:
+        """
+        Single pass over repos collecting every numeric aggregate the
+        analysis needs: totals, recency counts and per-repo quality scores.
+        """
+        now_utc = datetime.now(timezone.utc)
+        cutoff_30 = now_utc - timedelta(days=30)
+        cutoff_90 = now_utc - timedelta(days=90)
+
+        total_stars = total_forks = non_forks = recent_90 = 0
         scored = []
         for repo in repos:
-            score = 0
-            score += repo.get("stargazers_count", 0) * 2
-            score += repo.get("forks_count", 0) * 3
-
-            if repo.get("updated_at"):
-                updated = datetime.fromisoformat(repo["updated_at"].replace("Z", "+00:00"))
-                days = (datetime.now(updated.tzinfo) - updated).days
-                if days < 30:
-                    score += 20
-                elif days < 90:
-                    score += 10
+            stars = repo.get("stargazers_count", 0)
+            forks = repo.get("forks_count", 0)
+            total_stars += stars
+            total_forks += forks
+            score = stars * 2 + forks * 3
+
+            updated = self._updated_at(repo)
+            if updated and updated > cutoff_90:
+                recent_90 += 1
+                score += 20 if updated > cutoff_30 else 10
 
             if repo.get("description"):
                 score += 5
             if not repo.get("fork"):
+                non_forks += 1
                 score += 10
 
             scored.append((score, repo))
 
-        scored.sort(key=lambda x: x[0], reverse=True)
+        return {
+            "total_stars": total_stars,
+            "total_forks": total_forks,
+            "non_forks": non_forks,
+            "recent_90": recent_90,
+            "scored": scored,
+        }
+
+    def _get_top_repositories(self, stats: Dict[str, Any]) -> List[Dict]:
+        """Select top repos by the quality score from _aggregate_repos."""
         top = []
-        for _, r in scored[:10]:
+        for _, r in heapq.nlargest(10, stats["scored"], key=lambda x: x[0]):
             top.append({
                 "name": r["name"],
                 "description": r.get("description", ""),
@@ -231,31 +474,19 @@ class GitHubAnalyzer:
             })
         return top
 
-    def _calculate_activity_score(self, repos: List[Dict], user_info: Dict) -> float:
+    def _calculate_activity_score(self, stats: Dict[str, Any], user_info: Dict) -> float:
         """0-100 score from repos, stars, forks, recency, age & followers."""
+        now_utc = datetime.now(timezone.utc)
         score = 0.0
 
-        repo_count = len([r for r in repos if not r.get("fork")])
-        score += min(repo_count * 2, 20)
-
-        total_stars = sum(r.get("stargazers_count", 0) for r in repos)
-        score += min(total_stars / 10, 20)
-
-        total_forks = sum(r.get("forks_count", 0) for r in repos)
-        score += min(total_forks / 5, 20)
-
-        recent = 0
-        for r in repos:
-            if r.get("updated_at"):
-                updated = datetime.fromisoformat(r["updated_at"].replace("Z", "+00:00"))
-                if (datetime.now(updated.tzinfo) - updated).days < 90:
-                    recent += 1
-        score += min(recent * 2, 20)
+        score += min(stats["non_forks"] * 2, 20)
+        score += min(stats["total_stars"] / 10, 20)
+        score += min(stats["total_forks"] / 5, 20)
+        score += min(stats["recent_90"] * 2, 20)
 
         if user_info.get("created_at"):
-            created = datetime.fromisoformat(user_info["created_at"].replace("Z", "+00:00"))
-            days = (datetime.now(created.tzinfo) - created).days
-            if days > 365:
+            created = ciso8601.parse_datetime(user_info["created_at"])
+            if now_utc - created >= timedelta(days=366):
                 score += 10
 
         followers = user_info.get("followers", 0)
@@ -1,13 +1,19 @@
 # app/services/job_matcher.py
 
-from typing import List, Dict, Tuple, Set
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from typing import List, Dict, Tuple, Set, FrozenSet, Optional
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import or_, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import re
+import time
+from functools import lru_cache
+from itertools import islice
 from datetime import datetime
 import logging
 
 from app.db.models import User, Skill, Job, Match, SkillMaster
+from app.services.keyword_matcher import build_automaton, terms_in_order
 
 logger = logging.getLogger(__name__)
 
@@ -35,15 +41,26 @@ ALIASES = {
 }
 
 BULLETS = r"\u2022|\u2023|\u25E6|\u2043|\u2219|•|·|●"
+_BULLETS_RE = re.compile(BULLETS)
+_SPLIT_RE = re.compile(rf"[,\|;/\n\t]+|{BULLETS}")
+_KEEP_RE = re.compile(r"[^a-z0-9\+\#\.\-/ ]+")
+_WS_RE = re.compile(r"\s+")
 
-def _norm_token(s: str) -> str:
+def _norm_text(s: str) -> str:
+    """Normalize free text (e.g. a job description) for skill scanning."""
     s = (s or "").lower().strip()
     # normalize bullets & connectors
-    s = re.sub(BULLETS, " ", s)
+    s = _BULLETS_RE.sub(" ", s)
     s = s.replace("&", " and ")
     # keep letters, digits, + # . - / and space
-    s = re.sub(r"[^a-z0-9\+\#\.\-/ ]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _KEEP_RE.sub(" ", s)
+    return _WS_RE.sub(" ", s).strip()
+
+# Skill tokens repeat across thousands of jobs; descriptions go through
+# _norm_text instead so they don't churn this cache.
+@lru_cache(maxsize=65536)
+def _norm_token(s: str) -> str:
+    s = _norm_text(s)
     # apply alias map
     return ALIASES.get(s, s)
 
@@ -51,18 +68,167 @@ def _tokenize_skills(raw: str) -> Set[str]:
     """Split on common delimiters and bullets; normalize each token."""
     if not raw:
         return set()
-    parts = re.split(rf"[,\|;/\n\t]+|{BULLETS}", raw)
-    return { _norm_token(p) for p in parts if _norm_token(p) }
+    parts = _SPLIT_RE.split(raw)
+    return {t for t in map(_norm_token, parts) if t}
+
+# skill -> skills it implies (user knows key => partially covers value)
+_RELATIONS = {
+    "python": ["django", "flask", "fastapi", "pandas", "numpy", "scikit-learn", "pytorch"],
+    "javascript": ["react", "angular", "vue", "node.js", "express", "typescript", "next.js", "jquery"],
+    "typescript": ["javascript", "react", "angular", "node.js"],
+    "java": ["spring", "spring boot", "hibernate", "maven", "gradle"],
+    "c#": [".net", "asp.net", "entity framework", "xamarin"],
+    ".net": ["c#", "asp.net", "entity framework"],
+    "php": ["laravel", "symfony", "wordpress", "drupal"],
+    "ruby": ["rails", "ruby on rails", "sinatra"],
+    "go": ["golang", "gin", "echo"],
+    "rust": ["actix", "rocket"],
+    "sql": ["postgresql", "mysql", "sqlite", "oracle", "sql server"],
+    "postgresql": ["sql", "postgres"],
+    "mysql": ["sql", "mariadb"],
+    "nosql": ["mongodb", "redis", "cassandra", "dynamodb", "couchdb"],
+    "mongodb": ["nosql", "mongoose"],
+    "redis": ["nosql", "caching"],
+    "devops": ["docker", "kubernetes", "jenkins", "ci/cd", "terraform", "ansible"],
+    "docker": ["kubernetes", "containerization", "devops"],
+    "kubernetes": ["docker", "k8s", "helm", "devops"],
+    "ci/cd": ["jenkins", "github actions", "gitlab ci", "circleci", "devops"],
+    "cloud": ["aws", "azure", "gcp", "cloud computing"],
+    "aws": ["cloud", "ec2", "s3", "lambda", "dynamodb"],
+    "azure": ["cloud", "azure devops", "cosmos db"],
+    "gcp": ["cloud", "google cloud", "bigquery"],
+    "frontend": ["html", "css", "javascript", "react", "angular", "vue", "ui/ux"],
+    "backend": ["api", "rest", "graphql", "microservices", "server", "database"],
+    "fullstack": ["frontend", "backend", "database", "api"],
+    "mobile": ["ios", "android", "react native", "flutter", "swift", "kotlin"],
+    "ios": ["swift", "objective-c", "xcode", "mobile"],
+    "android": ["kotlin", "java", "android studio", "mobile"],
+    "react native": ["react", "mobile", "javascript"],
+    "flutter": ["dart", "mobile"],
+    "machine learning": ["python", "tensorflow", "pytorch", "scikit-learn", "ai"],
+    "data science": ["python", "r", "pandas", "numpy", "statistics", "machine learning"],
+    "ai": ["machine learning", "deep learning", "neural networks", "python"],
+}
+RELATIONS: Dict[str, FrozenSet[str]] = {k: frozenset(v) for k, v in _RELATIONS.items()}
+
+def _invert(relations: Dict[str, FrozenSet[str]]) -> Dict[str, FrozenSet[str]]:
+    """skill -> skills whose relation list contains it"""
+    inverse: Dict[str, Set[str]] = {}
+    for skill, targets in relations.items():
+        for target in targets:
+            inverse.setdefault(target, set()).add(skill)
+    return {k: frozenset(v) for k, v in inverse.items()}
+
+RELATED_BY = _invert(RELATIONS)
+
+_NO_SKILLS: FrozenSet[str] = frozenset()
+
+# Job columns the matcher reads up front; description is fetched separately
+# and only for jobs whose skill extraction needs it
+_MATCH_COLUMNS = (
+    Job.id, Job.title, Job.company, Job.location, Job.remote,
+    Job.salary_min, Job.salary_max, Job.required_skills, Job.url, Job.created_at,
+)
+_CANDIDATE_BATCH = 500
+
+# Headings that introduce a skills section in a job description
+_MARKER_RE = re.compile(
+    r"skills:|requirements:|required:|qualifications:|must have:"
+    r"|technical skills:|what you'll need:"
+)
+# Common non-skill words that show up between delimiters in those sections
+_STOPWORDS = frozenset(["and", "or", "with", "using", "years", "experience"])
+
+_REMOTE_TOKENS = ("remote", "anywhere", "worldwide")
+_SENIOR_KEYWORDS = ("senior", "lead", "principal", "staff", "architect")
+_JUNIOR_KEYWORDS = ("junior", "entry", "intern", "graduate", "trainee")
+
+def _norm_sql(column):
+    """
+    SQL counterpart of _norm_text for substring prefilters: lowercase, "&"
+    to " and ", and every run of other characters or whitespace collapsed
+    to one space (leading/trailing spaces are kept, which LIKE ignores).
+    """
+    lowered = func.lower(func.coalesce(column, ""))
+    return func.regexp_replace(func.replace(lowered, "&", " and "), r"[^a-z0-9+#./-]+", " ", "g")
+
+def _like_escape(s: str) -> str:
+    """Escape LIKE wildcards so a skill term matches literally."""
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 class JobMatcher:
+    # SkillMaster terms + automaton shared by every matcher in the process
+    _skillmaster_cache: Optional[FrozenSet[str]] = None
+    _skill_automaton_cache = None
+    _skill_max_len: int = 0
+    _skillmaster_loaded_at: float = 0.0
+    SKILLS_CACHE_TTL = 3600  # seconds
+
     def __init__(self, db: Session):
         self.db = db
-        # cache SkillMaster names for fallback scanning (optional)
-        try:
-            self._skillmaster = { _norm_token(n) for (n,) in db.query(SkillMaster.name).all() } or set()
-        except:
-            logger.warning("SkillMaster table not available, using empty set")
-            self._skillmaster = set()
+        self._load_skillmaster()
+        # job.id -> extraction entry (see _job_skills); jobs don't change
+        # during a matching run, so batch matching extracts each job once
+        self._job_skill_cache: Dict[int, Dict] = {}
+        # user_id -> normalized skills, for the lifetime of this matcher
+        self._user_skill_cache: Dict[int, FrozenSet[str]] = {}
+        # (job, description head, normalized required_skills) for every job,
+        # filled by prefetch_jobs when one matcher scores a batch of users
+        self._jobs: Optional[List[Tuple[Job, str, str]]] = None
+
+    @classmethod
+    def reload_skills(cls):
+        """Drop the shared SkillMaster cache; the next matcher reloads it."""
+        cls._skillmaster_cache = None
+
+    def _load_skillmaster(self):
+        """Load normalized SkillMaster names for fallback scanning (cached per process)."""
+        cls = type(self)
+        expired = time.monotonic() - cls._skillmaster_loaded_at > cls.SKILLS_CACHE_TTL
+        if cls._skillmaster_cache is None or expired:
+            try:
+                # stream the (possibly large) table instead of one .all() list
+                # profile-only rows are user free text, not matching vocabulary
+                names = (
+                    self.db.query(SkillMaster.name)
+                    .filter(SkillMaster.source.is_distinct_from("profile"))
+                    .yield_per(1000)
+                )
+                cls._skillmaster_cache = frozenset(_norm_token(n) for (n,) in names if n)
+                # one automaton over all SkillMaster terms for description scanning
+                cls._skill_automaton_cache = build_automaton(cls._skillmaster_cache)
+                cls._skill_max_len = max(map(len, cls._skillmaster_cache), default=0)
+                cls._skillmaster_loaded_at = time.monotonic()
+            except Exception:
+                logger.warning("SkillMaster table not available, using empty set")
+                self._skillmaster = frozenset()
+                self._skill_automaton = None
+                self._skill_max_len = 0
+                return
+        self._skillmaster = cls._skillmaster_cache
+        self._skill_automaton = cls._skill_automaton_cache
+        self._skill_max_len = cls._skill_max_len
+
+    def prefetch_jobs(self) -> int:
+        """
+        Load the match columns of every job once, so each user in a batch
+        filters candidates in memory instead of querying jobs again. The
+        jobs are expunged so the per-user commits in _save_matches don't
+        expire them; descriptions fetched later stay on the instances.
+        """
+        if self._jobs is None:
+            rows = (
+                self.db.query(Job, func.coalesce(func.substr(Job.description, 1, 200), ""))
+                .options(load_only(*_MATCH_COLUMNS))
+                .yield_per(_CANDIDATE_BATCH)
+            )
+            self._jobs = [
+                (job, desc_head, _norm_text(job.required_skills))
+                for job, desc_head in rows
+            ]
+            for job, _, _ in self._jobs:
+                self.db.expunge(job)
+        return len(self._jobs)
 
     def match_jobs_for_user(self, user_id: int) -> List[Dict]:
         """Match jobs for a user based on their skills."""
@@ -76,15 +242,23 @@ class JobMatcher:
             logger.info(f"User {user_id} has no skills")
             return []
 
-        jobs = self.db.query(Job).all()
-        if not jobs:
-            logger.info("No jobs in database")
-            return []
-
+        profile = self._user_profile(user, user_skills)
         matched_jobs = []
-        for job in jobs:
-            match_score, match_reasons = self._calculate_match_score(user_skills, job, user)
-            if match_score > 0:
+        candidates = 0
+        # Scoring stays in-process: Celery's prefork children are daemonic
+        # and cannot start a process pool, and the per-job caches above
+        # would not survive pickling. Batch matching parallelizes across
+        # users via Celery instead.
+        rows = iter(self._candidate_jobs(user_skills))
+        for batch in iter(lambda: list(islice(rows, _CANDIDATE_BATCH)), []):
+            candidates += len(batch)
+            self._load_descriptions([job for job, _ in batch], user_skills)
+            for job, desc_head in batch:
+                match_score, match_reasons = self._calculate_match_score(
+                    user_skills, job, user, profile, desc_head
+                )
+                if match_score <= 0:
+                    continue
                 matched_jobs.append({
                     "job_id": job.id,
                     "title": job.title,
@@ -93,7 +267,6 @@ class JobMatcher:
                     "remote": job.remote,
                     "salary_min": job.salary_min,
                     "salary_max": job.salary_max,
-                    "description": job.description,
                     "required_skills": job.required_skills,
                     "url": job.url,
                     "match_score": match_score,
@@ -101,106 +274,209 @@ class JobMatcher:
                     "created_at": job.created_at
                 })
 
+        if not candidates:
+            logger.info("No candidate jobs in database")
+            return []
+
         matched_jobs.sort(key=lambda x: x['match_score'], reverse=True)
         self._save_matches(user_id, matched_jobs[:50])
         return matched_jobs
 
-    def _get_user_skills(self, user_id: int) -> Set[str]:
+    def _candidate_jobs(self, user_skills: Set[str]):
+        """
+        Stream only jobs that can score above zero: those whose
+        required_skills mention a user skill (or one of its aliases), plus
+        jobs without required_skills, which are scored from the description.
+        Terms are normalized tokens, so required_skills is normalized the
+        same way before the substring test (NBSPs, "&", doubled spaces).
+        After prefetch_jobs the same filter runs over the cached jobs.
+        """
+        terms = set(user_skills)
+        terms.update(alias for alias, canon in ALIASES.items() if canon in user_skills)
+        if self._jobs is not None:
+            return [
+                (job, desc_head) for job, desc_head, required in self._jobs
+                if not required or any(t in required for t in terms)
+            ]
+        required = _norm_sql(Job.required_skills)
+        conditions = [
+            required.like(f"%{_like_escape(t)}%", escape="\\")
+            for t in terms
+        ]
+        conditions.append(func.trim(required) == "")
+        return (
+            self.db.query(Job, func.coalesce(func.substr(Job.description, 1, 200), ""))
+            .options(load_only(*_MATCH_COLUMNS))
+            .filter(or_(*conditions))
+            .yield_per(_CANDIDATE_BATCH)
+        )
+
+    def _load_descriptions(self, jobs: List[Job], user_skills: FrozenSet[str]):
+        """
+        Fetch full descriptions in one query for the jobs whose extraction
+        reads them: no required skills at all (description fallback), or
+        fewer than 3 that overlap the user's, which get core skills from the
+        description. Jobs already fully extracted are skipped.
+        """
+        need = {}
+        for job in jobs:
+            entry = self._job_skill_cache.get(job.id)
+            if entry is not None and entry["ordered"] is not None:
+                continue
+            if "description" in job.__dict__:
+                # already fetched for an earlier user of this matcher
+                continue
+            required = _tokenize_skills(job.required_skills)
+            if not required or (len(required) < 3 and required & user_skills):
+                need[job.id] = job
+        if not need:
+            return
+        rows = self.db.query(Job.id, Job.description).filter(Job.id.in_(list(need)))
+        for job_id, description in rows:
+            set_committed_value(need[job_id], "description", description)
+
+    def _user_profile(self, user: User, user_skills: Set[str]) -> Dict:
+        """Per-user scoring inputs, computed once instead of once per job."""
+        location = ((getattr(user, 'location', '') or '') if user else '').lower()
+        skill_count = len(user_skills)
+        return {
+            "location": location,
+            "location_parts": location.split(',') if location else [],
+            "senior_fit": skill_count >= 15,
+            "junior_fit": skill_count <= 10,
+            "mid_fit": 8 <= skill_count <= 20,
+        }
+
+    def _get_user_skills(self, user_id: int) -> FrozenSet[str]:
         """Resume + GitHub skills, normalized and alias-adjusted."""
+        cached = self._user_skill_cache.get(user_id)
+        if cached is not None:
+            return cached
+
         rows = self.db.query(Skill.name).filter(Skill.user_id == user_id).all()
         user_skills = {
             _norm_token(name.replace("github_", "")) for (name,) in rows if name
         }
         # remove empties
-        user_skills = {s for s in user_skills if s}
+        user_skills = frozenset(s for s in user_skills if s)
         logger.info(f"User {user_id} has {len(user_skills)} unique skills (normalized)")
+        self._user_skill_cache[user_id] = user_skills
         return user_skills
 
-    def _get_job_skills(self, job: Job) -> Set[str]:
-        """Extract job skills with robust tokenization + fallback."""
-        if job.required_skills:
-            skills = _tokenize_skills(job.required_skills)
-        else:
-            skills = set()
+    def _job_skills(self, job: Job) -> Dict:
+        """
+        Cheap, cached part of job skill extraction. Returns an entry with
+        `required` (required_skills tokens in order), `skills` (the set that
+        overlap is scored against, falling back to a SkillMaster scan of
+        the description) and `ordered`, filled in by _ordered_job_skills
+        only for jobs that get past the zero-overlap check.
+        """
+        entry = self._job_skill_cache.get(job.id)
+        if entry is not None:
+            return entry
+
+        required: List[str] = []
         
+        # First try to extract from required_skills field
+        if job.required_skills:
+            # Split by common delimiters; dict keys dedupe while preserving order
+            parts = _SPLIT_RE.split(job.required_skills)
+            required = list(dict.fromkeys(t for t in map(_norm_token, parts) if t))
+
+        skills = frozenset(required)
+        desc_hits = None
+
         # fallback: scan description against SkillMaster terms
         if not skills and job.description:
-            text = _norm_token(job.description)
-            skills = { sm for sm in self._skillmaster if re.search(rf"\b{re.escape(sm)}\b", text) }
-        
-        return skills
+            text = _norm_text(job.description)
+            desc_hits = terms_in_order(self._skill_automaton, text)
+            skills = frozenset(desc_hits)
+
+        entry = {"required": required, "skills": skills, "desc_hits": desc_hits, "ordered": None}
+        self._job_skill_cache[job.id] = entry
+        return entry
 
-    def _ordered_job_skills(self, job: Job) -> List[str]:
+    def _ordered_job_skills(self, job: Job, entry: Dict) -> List[str]:
         """
         Extract job skills in order of appearance/importance.
         Skills that appear first in the requirements are considered more important.
         """
-        ordered = []
-        seen = set()
-        
-        # First try to extract from required_skills field
-        if job.required_skills:
-            # Split by common delimiters while preserving order
-            parts = re.split(rf"[,\|;/\n\t]+|{BULLETS}", job.required_skills)
-            
-            for part in parts:
-                skill = _norm_token(part)
-                if skill and skill not in seen:
-                    ordered.append(skill)
-                    seen.add(skill)
+        if entry["ordered"] is not None:
+            return entry["ordered"]
+
+        # insertion-ordered dict doubles as the "seen" set
+        ordered: Dict[str, None] = dict.fromkeys(entry["required"])
+        desc_hits = entry["desc_hits"]
         
         # If we didn't get enough skills, try extracting from description
         if len(ordered) < 3 and job.description:
             text = job.description.lower()
             
             # Look for skills section in description
-            skills_section = ""
-            markers = ["skills:", "requirements:", "required:", "qualifications:", 
-                      "must have:", "technical skills:", "what you'll need:"]
-            
-            for marker in markers:
-                if marker in text:
-                    idx = text.index(marker)
-                    # Get next 500 chars after the marker
-                    skills_section = text[idx:idx+500]
-                    break
+            m = _MARKER_RE.search(text)
+            # Get next 500 chars after the first marker
+            skills_section = text[m.start():m.start() + 500] if m else ""
             
             if skills_section:
                 # Extract skills from the skills section
-                parts = re.split(rf"[,\|;/\n\t]+|{BULLETS}", skills_section)
+                parts = _SPLIT_RE.split(skills_section)
                 for part in parts:
                     skill = _norm_token(part)
                     # Filter out common non-skill words
-                    if (skill and skill not in seen and 
+                    if (skill and skill not in ordered and 
                         len(skill) > 1 and 
-                        skill not in ["and", "or", "with", "using", "years", "experience"]):
-                        ordered.append(skill)
-                        seen.add(skill)
+                        skill not in _STOPWORDS):
+                        ordered[skill] = None
                         if len(ordered) >= 15:  # Reasonable limit
                             break
             
             # Last resort: check against known skills from SkillMaster
             if len(ordered) < 5 and self._skillmaster:
-                text_norm = _norm_token(job.description)
-                for skill in self._skillmaster:
-                    if skill not in seen and re.search(rf"\b{re.escape(skill)}\b", text_norm):
-                        ordered.append(skill)
-                        seen.add(skill)
+                if desc_hits is None:
+                    text_norm = _norm_text(job.description)
+                    # at most 10 ordered skills are kept, so the first 10
+                    # distinct hits always contain every one that can be used
+                    desc_hits = terms_in_order(
+                        self._skill_automaton, text_norm,
+                        limit=10, max_len=self._skill_max_len,
+                    )
+                for skill in desc_hits:
+                    if skill not in ordered:
+                        ordered[skill] = None
                         if len(ordered) >= 10:
                             break
         
-        return ordered
-
-    def _calculate_match_score(self, user_skills: Set[str], job: Job, user: User) -> Tuple[float, List[str]]:
-        """Calculate match score between user skills and job requirements."""
+        entry["ordered"] = list(ordered)
+        return entry["ordered"]
+
+    def _calculate_match_score(
+        self,
+        user_skills: Set[str],
+        job: Job,
+        user: User,
+        profile: Optional[Dict] = None,
+        desc_head: Optional[str] = None,
+    ) -> Tuple[float, List[str]]:
+        """
+        Calculate match score between user skills and job requirements.
+        desc_head is the first 200 characters of the description when the
+        caller loaded the job without it.
+        """
         reasons: List[str] = []
+        if profile is None:
+            profile = self._user_profile(user, user_skills)
 
-        # Get job skills
-        job_skills = self._get_job_skills(job)
+        entry = self._job_skills(job)
+        job_skills = entry["skills"]
         if not job_skills:
             return 0.0, ["No skills specified for this job"]
 
         matched = user_skills & job_skills
+        if not matched:
+            # Every core skill is then missing (-15), which outweighs the
+            # most the related/location/experience bonuses can add (+14),
+            # so the score would clamp to 0 anyway.
+            return 0.0, []
         missing = job_skills - user_skills
 
         # --- 1) Base: strict overlap (60%) ---
@@ -211,12 +487,14 @@ class JobMatcher:
             reasons.append(f"Matching skills: {', '.join(matched_list)}")
 
         # --- 2) Core skills coverage (bonus + penalty) ---
-        ordered = self._ordered_job_skills(job)
+        ordered = self._ordered_job_skills(job, entry)
         # Take first 5 as "core" skills
         core = ordered[:5] if ordered else list(job_skills)[:5]
-        core_set = set(core)
-        core_matched = core_set & matched
-        core_missing = core_set - matched
+        # core is already deduped; partition its ≤5 entries in one pass
+        core_matched: List[str] = []
+        core_missing: List[str] = []
+        for skill in core:
+            (core_matched if skill in matched else core_missing).append(skill)
 
         # Bonus up to +18 for core coverage, penalty up to -15 for missing core
         if core:
@@ -226,11 +504,11 @@ class JobMatcher:
             
             if core_missing:
                 score -= core_penalty
-                missing_list = sorted(list(core_missing))[:4]
+                missing_list = sorted(core_missing)[:4]
                 reasons.append(f"Missing core skills: {', '.join(missing_list)}")
             
             if core_matched:
-                matched_core_list = sorted(list(core_matched))[:4]
+                matched_core_list = sorted(core_matched)[:4]
                 reasons.append(f"Core skills matched: {', '.join(matched_core_list)}")
 
         # --- 3) Related skills (cap at 6) ---
@@ -244,39 +522,40 @@ class JobMatcher:
         # --- 4) Location (≤4) ---
         if job.location:
             jl = job.location.lower()
-            user_location = getattr(user, 'location', '').lower() if user else ''
+            user_location = profile["location"]
             
-            if job.remote or any(tok in jl for tok in ["remote", "anywhere", "worldwide"]):
+            if job.remote or any(tok in jl for tok in _REMOTE_TOKENS):
                 score += 4.0
                 reasons.append("Remote position")
             elif user_location and (
                 user_location in jl or 
                 jl in user_location or
-                any(city in jl for city in user_location.split(','))
+                any(city in jl for city in profile["location_parts"])
             ):
                 score += 4.0
                 reasons.append("Location match")
 
         # --- 5) Experience level match (≤4) ---
         title = (job.title or "").lower()
-        desc = (job.description or "").lower()
-        user_skill_count = len(user_skills)
+        if desc_head is None:
+            desc_head = (job.description or "")[:200]
+        desc_head = desc_head.lower()
         
         # Senior level
-        if any(k in title or k in desc[:200] for k in ["senior", "lead", "principal", "staff", "architect"]):
-            if user_skill_count >= 15:
+        if any(k in title or k in desc_head for k in _SENIOR_KEYWORDS):
+            if profile["senior_fit"]:
                 score += 4.0
                 reasons.append("Experience level match (Senior)")
             else:
                 score -= 2.0  # Penalty for under-qualified
         # Junior level
-        elif any(k in title or k in desc[:200] for k in ["junior", "entry", "intern", "graduate", "trainee"]):
-            if user_skill_count <= 10:
+        elif any(k in title or k in desc_head for k in _JUNIOR_KEYWORDS):
+            if profile["junior_fit"]:
                 score += 4.0
                 reasons.append("Experience level match (Entry/Junior)")
         # Mid level (default)
         else:
-            if 8 <= user_skill_count <= 20:
+            if profile["mid_fit"]:
                 score += 4.0
                 reasons.append("Experience level match (Mid-level)")
 
@@ -313,74 +592,37 @@ class JobMatcher:
     def _find_related_skills(self, user_skills: Set[str], required_skills: Set[str]) -> Set[str]:
         """Find related skills between user skills and required skills."""
         related_matches = set()
-        
-        # Expanded relations map
-        relations = {
-            "python": ["django", "flask", "fastapi", "pandas", "numpy", "scikit-learn", "pytorch"],
-            "javascript": ["react", "angular", "vue", "node.js", "express", "typescript", "next.js", "jquery"],
-            "typescript": ["javascript", "react", "angular", "node.js"],
-            "java": ["spring", "spring boot", "hibernate", "maven", "gradle"],
-            "c#": [".net", "asp.net", "entity framework", "xamarin"],
-            ".net": ["c#", "asp.net", "entity framework"],
-            "php": ["laravel", "symfony", "wordpress", "drupal"],
-            "ruby": ["rails", "ruby on rails", "sinatra"],
-            "go": ["golang", "gin", "echo"],
-            "rust": ["actix", "rocket"],
-            "sql": ["postgresql", "mysql", "sqlite", "oracle", "sql server"],
-            "postgresql": ["sql", "postgres"],
-            "mysql": ["sql", "mariadb"],
-            "nosql": ["mongodb", "redis", "cassandra", "dynamodb", "couchdb"],
-            "mongodb": ["nosql", "mongoose"],
-            "redis": ["nosql", "caching"],
-            "devops": ["docker", "kubernetes", "jenkins", "ci/cd", "terraform", "ansible"],
-            "docker": ["kubernetes", "containerization", "devops"],
-            "kubernetes": ["docker", "k8s", "helm", "devops"],
-            "ci/cd": ["jenkins", "github actions", "gitlab ci", "circleci", "devops"],
-            "cloud": ["aws", "azure", "gcp", "cloud computing"],
-            "aws": ["cloud", "ec2", "s3", "lambda", "dynamodb"],
-            "azure": ["cloud", "azure devops", "cosmos db"],
-            "gcp": ["cloud", "google cloud", "bigquery"],
-            "frontend": ["html", "css", "javascript", "react", "angular", "vue", "ui/ux"],
-            "backend": ["api", "rest", "graphql", "microservices", "server", "database"],
-            "fullstack": ["frontend", "backend", "database", "api"],
-            "mobile": ["ios", "android", "react native", "flutter", "swift", "kotlin"],
-            "ios": ["swift", "objective-c", "xcode", "mobile"],
-            "android": ["kotlin", "java", "android studio", "mobile"],
-            "react native": ["react", "mobile", "javascript"],
-            "flutter": ["dart", "mobile"],
-            "machine learning": ["python", "tensorflow", "pytorch", "scikit-learn", "ai"],
-            "data science": ["python", "r", "pandas", "numpy", "statistics", "machine learning"],
-            "ai": ["machine learning", "deep learning", "neural networks", "python"],
-        }
-
-        # Check for related skills
         for user_skill in user_skills:
-            if user_skill in relations:
-                for related in relations[user_skill]:
-                    if related in required_skills:
-                        related_matches.add(f"{user_skill}→{related}")
-            
-            # Check reverse relations
-            for req_skill in required_skills:
-                if req_skill in relations and user_skill in relations[req_skill]:
-                    related_matches.add(f"{user_skill}←{req_skill}")
-
+            for related in RELATIONS.get(user_skill, _NO_SKILLS) & required_skills:
+                related_matches.add(f"{user_skill}→{related}")
+            # reverse relations
+            for req_skill in RELATED_BY.get(user_skill, _NO_SKILLS) & required_skills:
+                related_matches.add(f"{user_skill}←{req_skill}")
         return related_matches
 
     def _save_matches(self, user_id: int, matched_jobs: List[Dict]):
         try:
-            # Clear existing matches for user
-            self.db.query(Match).filter(Match.user_id == user_id).delete()
-            
-            # Save new matches
-            for job in matched_jobs:
-                match = Match(
-                    user_id=user_id,
-                    job_id=job["job_id"],
-                    score=job["match_score"]
-                    # Removed matched_at since it doesn't exist in the model
+            rows = [
+                {"user_id": user_id, "job_id": job["job_id"], "score": job["match_score"]}
+                for job in matched_jobs
+            ]
+
+            # Drop matches that fell out of the kept set
+            self.db.query(Match).filter(
+                Match.user_id == user_id,
+                Match.job_id.notin_([row["job_id"] for row in rows]),
+            ).delete(synchronize_session=False)
+
+            # Upsert the rest in one executemany statement
+            if rows:
+                stmt = pg_insert(Match)
+                self.db.execute(
+                    stmt.on_conflict_do_update(
+                        constraint="uq_matches_user_job",
+                        set_={"score": stmt.excluded.score, "matched_at": stmt.excluded.matched_at},
+                    ),
+                    rows,
                 )
-                self.db.add(match)
             
             self.db.commit()
             logger.info(f"Saved {len(matched_jobs)} matches for user {user_id}")
@@ -390,36 +632,66 @@ class JobMatcher:
             self.db.rollback()
             raise
 
-    def get_user_matches(self, user_id: int, min_score: float = 0.0) -> List[Dict]:
-        """Get saved matches for a user."""
+    def get_user_matches(
+        self, user_id: int, min_score: float = 0.0, limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Get saved matches for a user, best first."""
         try:
-            matches = (
-                self.db.query(Match, Job)
-                .join(Job, Match.job_id == Job.id)
-                .filter(Match.user_id == user_id)
-                .filter(Match.score >= min_score)
+            # Plain column rows: no Match/Job ORM objects to hydrate
+            stmt = (
+                select(
+                    Job.id.label("job_id"),
+                    Job.title,
+                    Job.company,
+                    Job.location,
+                    Job.remote,
+                    Job.salary_min,
+                    Job.salary_max,
+                    Match.score.label("match_score"),
+                    Job.url,
+                    Job.created_at,  # job's posting date, not Match.matched_at
+                )
+                .join(Match, Match.job_id == Job.id)
+                .where(Match.user_id == user_id, Match.score >= min_score)
                 .order_by(Match.score.desc())
-                .all()
+                .limit(limit)
             )
-            
-            result = []
-            for match, job in matches:
-                result.append({
-                    "job_id": job.id,
-                    "title": job.title,
-                    "company": job.company,
-                    "location": job.location,
-                    "remote": job.remote,
-                    "salary_min": job.salary_min,
-                    "salary_max": job.salary_max,
-                    "match_score": match.score,
-                    # Removed matched_at since it doesn't exist
-                    "url": job.url,
-                    "created_at": job.created_at  # Use job's created_at instead
-                })
-            
-            return result
+            return [dict(row) for row in self.db.execute(stmt).mappings()]
             
         except Exception as e:
             logger.error(f"Error getting user matches: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+    def get_top_matches(self, user_id: int, limit: int = 10) -> List[Dict]:
+        """Get the user's highest-scoring saved matches."""
+        return self.get_user_matches(user_id, limit=limit)
+
+    def get_match_statistics(self, user_id: int) -> Dict:
+        """Aggregate a user's saved matches in a single query."""
+        score = Match.score
+        row = (
+            self.db.query(
+                func.count(Match.id),
+                func.avg(score),
+                func.max(score),
+                func.count(Match.id).filter(score >= 80),
+                func.count(Match.id).filter(score >= 60, score < 80),
+                func.count(Match.id).filter(score >= 40, score < 60),
+                func.count(Match.id).filter(score < 40),
+            )
+            .filter(Match.user_id == user_id)
+            .one()
+        )
+        total, avg_score, top_score, excellent, good, moderate, low = row
+        return {
+            "total_matches": total,
+            "average_score": round(float(avg_score or 0), 2),
+            "top_match_score": float(top_score or 0),
+            # same bands as the match summary labels
+            "match_distribution": {
+                "excellent": excellent,
+                "good": good,
+                "moderate": moderate,
+                "low": low,
+            },
+        }
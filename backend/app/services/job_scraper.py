@@ -1,18 +1,96 @@
 # app/services/job_scraper.py
+import re
 import urllib3
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-import time
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 # from app.db.models import Job, JobType, ExperienceLevel
 from app.db.models import Job, JobTypeEnum as JobType, ExperienceLevel
-from app.core.cache import cache_manager
+from app.services.keyword_matcher import build_automaton, terms_in_order
 
 logger = logging.getLogger(__name__)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Resume-HitHub Job Aggregator)'
+}
+
+
+def _build_session() -> requests.Session:
+    """Keep-alive session with pooled connections and transient-error retries."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    # 429 included so API rate limits back off here, honouring Retry-After
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared by every scraper in the process so repeat fetches reuse TLS connections
+_session = _build_session()
+
+
+# Common technical skills to look for in job text
+_SKILL_KEYWORDS = (
+    # Languages
+    'python', 'javascript', 'java', 'c++', 'c#', 'ruby', 'go', 'rust', 'php', 'swift',
+    'typescript', 'kotlin', 'scala', 'r', 'matlab', 'perl',
+    
+    # Frontend
+    'react', 'angular', 'vue', 'svelte', 'html', 'css', 'sass', 'jquery',
+    'webpack', 'babel', 'next.js', 'nuxt.js', 'gatsby',
+    
+    # Backend
+    'node.js', 'express', 'django', 'flask', 'fastapi', 'spring', 'rails',
+    '.net', 'laravel', 'symfony',
+    
+    # Databases
+    'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'elasticsearch',
+    'cassandra', 'dynamodb', 'oracle', 'sqlite',
+    
+    # Cloud & DevOps
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'terraform',
+    'ansible', 'gitlab', 'circleci', 'travis ci',
+    
+    # Other
+    'git', 'linux', 'rest api', 'graphql', 'microservices', 'ci/cd',
+    'machine learning', 'deep learning', 'tensorflow', 'pytorch'
+)
+_SKILL_AUTOMATON = build_automaton(_SKILL_KEYWORDS)
+_SKILL_MAX_LEN = max(map(len, _SKILL_KEYWORDS))
+
+# Tags accepted as required skills on TheirStack postings
+_KNOWN_SKILLS = frozenset({
+    'python', 'javascript', 'java', 'react', 'angular', 'vue',
+    'django', 'flask', 'node.js', 'express', 'sql', 'mongodb',
+    'aws', 'docker', 'kubernetes', 'git', 'api', 'rest'
+})
+
+# Salary figures such as "$120,000", "85k" or "95K"
+_SALARY_RE = re.compile(r'\$?(\d{1,3}(?:,\d{3})*(?:k)?)', re.I)
+
+# Seniority markers in job titles; anything else (incl. "mid-level") is MID
+_EXP_LEVELS = {
+    'senior': ExperienceLevel.SENIOR, 'sr.': ExperienceLevel.SENIOR,
+    'lead': ExperienceLevel.SENIOR, 'principal': ExperienceLevel.SENIOR,
+    'junior': ExperienceLevel.JUNIOR, 'jr.': ExperienceLevel.JUNIOR,
+    'entry': ExperienceLevel.JUNIOR,
+}
+_EXP_RE = re.compile(r'\b(senior|sr\.|lead|principal|junior|jr\.|entry)(?!\w)')
+
+# Case-insensitive flags for Adzuna postings, searched without lowercasing
+# the (up to 5000-char) description first
+_REMOTE_RE = re.compile(r'remote', re.I)
+_FULL_TIME_RE = re.compile(r'full time', re.I)
+
+
 class JobScraperService:
     """
     Scrape jobs from multiple free APIs
@@ -20,216 +98,147 @@ class JobScraperService:
     
     def __init__(self, db: Session):
         self.db = db
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Resume-HitHub Job Aggregator)'
-        }
-    
-    def scrape_all_sources(self) -> Dict:
-        """
-        Scrape jobs from all configured sources
-        """
-        results = {
-            "arbeitnow": 0,  
-            "remotive": 0,
-            "adzuna": 0,
-            "theirstack": 0,
-            "errors": []
-        }
-        
-        # 1. Scrape Remotive (no API key needed)
-        try:
-            arbeitnow_jobs = self.scrape_arbeitnow_jobs()
-            results["arbeitnow"] = arbeitnow_jobs
-        except Exception as e:
-            logger.error(f"Arbeitnow scraping failed: {e}")
-            results["errors"].append(f"Arbeitnow: {str(e)}")
-        try:
-            remotive_jobs = self.scrape_remotive_jobs()
-            results["remotive"] = remotive_jobs
-        except Exception as e:
-            logger.error(f"Remotive scraping failed: {e}")
-            results["errors"].append(f"Remotive: {str(e)}")
-        
-        # 2. Scrape Adzuna (free tier available)
-        try:
-            adzuna_jobs = self.scrape_adzuna_jobs()
-            results["adzuna"] = adzuna_jobs
-        except Exception as e:
-            logger.error(f"Adzuna scraping failed: {e}")
-            results["errors"].append(f"Adzuna: {str(e)}")
-        
-        # 3. Scrape TheirStack (free API)
-        try:
-            theirstack_jobs = self.scrape_theirstack_jobs()
-            results["theirstack"] = theirstack_jobs
-        except Exception as e:
-            logger.error(f"TheirStack scraping failed: {e}")
-            results["errors"].append(f"TheirStack: {str(e)}")
-        
-        # Invalidate job match caches after new jobs
-        cache_manager.delete_pattern("user:matches:*")
-        
-        return results
+        self.headers = HEADERS
+        self.session = _session
     
     def scrape_remotive_jobs(self, limit: int = 50) -> int:
         """
         Scrape jobs from Remotive.io (completely free, no auth needed)
         """
+        try:
+            jobs = self._fetch_remotive_jobs(limit)
+        except requests.RequestException as e:
+            logger.error(f"[Remotive] ❌ Request failed: {e}")
+            logger.info("Remotive API is having SSL issues, skipping...")
+            return 0
+        added = self._persist_remotive_jobs(jobs)
+        self.db.commit()
+        return added
+    
+    def _fetch_remotive_jobs(self, limit: int = 50) -> List[Dict]:
         url = "https://remotive.io/api/remote-jobs"
         params = {"limit": limit, "category": "software-dev"}
+        
+        # Transient 5xx retries are handled by the session's adapter
+        logger.info("[Remotive] Fetching jobs...")
+        response = self.session.get(url, params=params, timeout=10, verify=False)
+        if response.status_code == 526:
+            logger.error("[Remotive] Cloudflare SSL error (526). Skipping Remotive.")
+            return []
+        response.raise_for_status()
+        return response.json().get("jobs", [])
     
-        for attempt in range(3):
-            try:
-                logger.info(f"[Remotive] Fetching jobs (attempt {attempt+1})...")
-                response = requests.get(url, headers=self.headers, params=params, timeout=10, verify=False)
-                if response.status_code == 526:
-                    logger.error("[Remotive] Cloudflare SSL error (526). Skipping Remotive.")
-                    return 0
-                response.raise_for_status()
-            
-                jobs = response.json().get("jobs", [])
-                added = sum(self._save_remotive_job(job) for job in jobs)
-                logger.info(f"[Remotive] ✅ Added {added} jobs.")
-                return added
-            
-            except requests.RequestException as e:
-                logger.warning(f"[Remotive] Attempt {attempt+1} failed: {e}")
-                logger.error(f"SSL Error with Remotive: {e}")
-                logger.info("Remotive API is having SSL issues, skipping...")
-                return 0
-
-    
-        logger.error("[Remotive] ❌ All attempts failed.")
-        return 0
+    def _persist_remotive_jobs(self, jobs: List[Dict]) -> int:
+        rows = self._build_rows(
+            self._build_remotive_row, lambda j: f"remotive_{j['id']}", jobs, "Remotive"
+        )
+        added = self._insert_jobs(rows)
+        logger.info(f"[Remotive] ✅ Added {added} jobs.")
+        return added
     
-    def _save_remotive_job(self, job_data: Dict) -> bool:
+    def _build_remotive_row(self, job_data: Dict, external_id: str) -> Dict:
         """
-        Save a Remotive job to database
+        Build a jobs row from a Remotive job
         """
-        try:
-            # Check if job already exists
-            external_id = f"remotive_{job_data['id']}"
-            existing = self.db.query(Job).filter_by(external_id=external_id).first()
-            
-            if existing:
-                logger.debug(f"Job already exists: {external_id}")
-                return False
-            
-            # Extract and clean data
-            title = job_data.get("title", "")
-            company = job_data.get("company_name", "Unknown")
-            
-            # Parse skills from job title and description
-            description = job_data.get("description", "")
-            required_skills = self._extract_skills_from_text(title + " " + description)
-            
-            # Parse salary if available
-            salary_min, salary_max = self._parse_salary(job_data.get("salary", ""))
-            
-            # Determine experience level from title
-            experience_level = self._determine_experience_level(title)
-            
-            
-            # Create job
-            job = Job(
-                title=title,
-                company=company,
-                location=job_data.get("candidate_required_location", "Remote"),
-                description=description[:5000],  # Limit description length
-                required_skills=", ".join(required_skills),
-                url=job_data.get("url", ""),
-                remote=True,  # Remotive only has remote jobs
-                salary_min=salary_min,
-                salary_max=salary_max,
-                job_type=JobType.FULL_TIME,
-                experience_level=experience_level,
-                source="remotive",
-                external_id=external_id,
-                company_logo_url=job_data.get("company_logo_url", ""),
-                expires_at=datetime.utcnow() + timedelta(days=30)
-            )
-            
-            self.db.add(job)
-            self.db.commit()
-            
-            logger.info(f"Added job: {title} at {company}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error saving Remotive job: {e}")
-            self.db.rollback()
-            return False
+        # Extract and clean data
+        title = job_data.get("title", "")
+        company = job_data.get("company_name") or "Unknown"
         
-    def scrape_arbeitnow_jobs(self, limit: int = 50) -> int:
-
-        url = "https://www.arbeitnow.com/api/job-board-api"
+        # Parse skills from job title and description
+        description = job_data.get("description", "")
+        required_skills = self._extract_skills_from_text(title + " " + description)
+        
+        # Parse salary if available
+        salary_min, salary_max = self._parse_salary(job_data.get("salary", ""))
         
+        # Determine experience level from title
+        experience_level = self._determine_experience_level(title)
+        
+        return dict(
+            title=title,
+            company=company,
+            location=job_data.get("candidate_required_location", "Remote"),
+            description=description[:5000],  # Limit description length
+            required_skills=", ".join(required_skills),
+            url=job_data.get("url", ""),
+            remote=True,  # Remotive only has remote jobs
+            salary_min=salary_min,
+            salary_max=salary_max,
+            job_type=JobType.FULL_TIME,
+            experience_level=experience_level,
+            source="remotive",
+            external_id=external_id,
+            company_logo_url=job_data.get("company_logo_url", ""),
+            expires_at=datetime.utcnow() + timedelta(days=30)
+        )
+        
+    def scrape_arbeitnow_jobs(self, limit: int = 50) -> int:
         try:
-            logger.info("Fetching jobs from Arbeitnow...")
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            jobs = data.get("data", [])[:limit]
-            
-            added_count = 0
-            for job_data in jobs:
-                if self._save_arbeitnow_job(job_data):
-                    added_count += 1
-            
-            logger.info(f"Added {added_count} jobs from Arbeitnow")
-            return added_count
-            
-        except Exception as e:
+            added = self._persist_arbeitnow_jobs(self._fetch_arbeitnow_jobs(limit))
+            self.db.commit()
+            return added
+        except requests.RequestException as e:
             logger.error(f"Error scraping Arbeitnow: {e}")
             return 0
+    
+    def _fetch_arbeitnow_jobs(self, limit: int = 50) -> List[Dict]:
+        url = "https://www.arbeitnow.com/api/job-board-api"
+        
+        logger.info("Fetching jobs from Arbeitnow...")
+        response = self.session.get(url, timeout=10)
+        response.raise_for_status()
+        
+        data = response.json()
+        return data.get("data", [])[:limit]
+    
+    def _persist_arbeitnow_jobs(self, jobs: List[Dict]) -> int:
+        rows = self._build_rows(
+            self._build_arbeitnow_row, lambda j: f"arbeitnow_{j.get('slug', 'unknown')}", jobs, "Arbeitnow"
+        )
+        added_count = self._insert_jobs(rows)
+        logger.info(f"Added {added_count} jobs from Arbeitnow")
+        return added_count
 
-    def _save_arbeitnow_job(self, job_data: Dict) -> bool:
-        """Save Arbeitnow job"""
-        try:
-            external_id = f"arbeitnow_{job_data.get('slug', 'unknown')}"
-            existing = self.db.query(Job).filter_by(external_id=external_id).first()
-            
-            if existing:
-                return False
-            
-            # Extract skills from tags
-            tags = job_data.get('tags', [])
-            
-            job = Job(
-                title=job_data.get('title', ''),
-                company=job_data.get('company_name', 'Unknown'),
-                location=job_data.get('location', 'Remote'),
-                description=job_data.get('description', '')[:5000],
-                required_skills=', '.join(tags),
-                url=job_data.get('url', ''),
-                remote=job_data.get('remote', False),
-                source="arbeitnow",
-                external_id=external_id,
-                expires_at=datetime.utcnow() + timedelta(days=30)
-            )
-            
-            self.db.add(job)
-            self.db.commit()
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error saving Arbeitnow job: {e}")
-            self.db.rollback()
-            return False
+    def _build_arbeitnow_row(self, job_data: Dict, external_id: str) -> Dict:
+        """Build a jobs row from an Arbeitnow job"""
+        # Extract skills from tags
+        tags = job_data.get('tags', [])
+        
+        return dict(
+            title=job_data.get('title', ''),
+            company=job_data.get('company_name') or 'Unknown',
+            location=job_data.get('location', 'Remote'),
+            description=job_data.get('description', '')[:5000],
+            required_skills=', '.join(tags),
+            url=job_data.get('url', ''),
+            remote=job_data.get('remote', False),
+            job_type=JobType.FULL_TIME,
+            source="arbeitnow",
+            external_id=external_id,
+            expires_at=datetime.utcnow() + timedelta(days=30)
+        )
     
     def scrape_adzuna_jobs(self, limit: int = 50) -> int:
         """
         Scrape jobs from Adzuna (requires free API key)
         Get your free key at: https://developer.adzuna.com/
         """
+        try:
+            added = self._persist_adzuna_jobs(self._fetch_adzuna_jobs(limit))
+            self.db.commit()
+            return added
+        except requests.RequestException as e:
+            logger.error(f"Error scraping Adzuna: {e}")
+            return 0
+    
+    def _fetch_adzuna_jobs(self, limit: int = 50) -> List[Dict]:
         # You need to sign up for free API keys
         APP_ID = "29d697e9"  # Replace with your ID
         APP_KEY = "7e7d8a4fe10852570963835adccd53ac"  # Replace with your key
         
         if APP_ID == "your_adzuna_app_id":
             logger.warning("Adzuna API keys not configured. Skipping...")
-            return 0
+            return []
         
         url = "https://api.adzuna.com/v1/api/jobs/us/search/1"
         params = {
@@ -240,174 +249,164 @@ class JobScraperService:
             "content-type": "application/json"
         }
         
-        try:
-            logger.info("Fetching jobs from Adzuna...")
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            jobs = data.get("results", [])
-            
-            added_count = 0
-            for job_data in jobs:
-                if self._save_adzuna_job(job_data):
-                    added_count += 1
-            
-            logger.info(f"Added {added_count} jobs from Adzuna")
-            return added_count
-            
-        except Exception as e:
-            logger.error(f"Error scraping Adzuna: {e}")
-            return 0
+        logger.info("Fetching jobs from Adzuna...")
+        response = self.session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        
+        data = response.json()
+        return data.get("results", [])
     
-    def _save_adzuna_job(self, job_data: Dict) -> bool:
-        """Save an Adzuna job to database"""
-        try:
-            external_id = f"adzuna_{job_data['id']}"
-            existing = self.db.query(Job).filter_by(external_id=external_id).first()
-            
-            if existing:
-                return False
-            
-            title = job_data.get("title", "")
-            company = job_data.get("company", {}).get("display_name", "Unknown")
-            description = job_data.get("description", "")
-            
-            # Extract skills
-            required_skills = self._extract_skills_from_text(title + " " + description)
-            
-            # Parse salary
-            salary_min = job_data.get("salary_min", 0)
-            salary_max = job_data.get("salary_max", 0)
-            
-            job = Job(
-                title=title,
-                company=company,
-                location=job_data.get("location", {}).get("display_name", "Unknown"),
-                description=description[:5000],
-                required_skills=", ".join(required_skills),
-                url=job_data.get("redirect_url", ""),
-                remote="remote" in title.lower() or "remote" in description.lower(),
-                salary_min=salary_min,
-                salary_max=salary_max,
-                job_type=JobType.FULL_TIME if "full time" in description.lower() else JobType.CONTRACT,
-                source="adzuna",
-                external_id=external_id,
-                expires_at=datetime.utcnow() + timedelta(days=30)
-            )
-            
-            self.db.add(job)
-            self.db.commit()
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error saving Adzuna job: {e}")
-            self.db.rollback()
-            return False
+    def _persist_adzuna_jobs(self, jobs: List[Dict]) -> int:
+        rows = self._build_rows(
+            self._build_adzuna_row, lambda j: f"adzuna_{j['id']}", jobs, "Adzuna"
+        )
+        added_count = self._insert_jobs(rows)
+        logger.info(f"Added {added_count} jobs from Adzuna")
+        return added_count
+    
+    def _build_adzuna_row(self, job_data: Dict, external_id: str) -> Dict:
+        """Build a jobs row from an Adzuna job"""
+        title = job_data.get("title", "")
+        company = job_data.get("company", {}).get("display_name") or "Unknown"
+        description = job_data.get("description", "")
+        
+        # Extract skills
+        required_skills = self._extract_skills_from_text(title + " " + description)
+        
+        # Parse salary
+        salary_min = job_data.get("salary_min", 0)
+        salary_max = job_data.get("salary_max", 0)
+        
+        return dict(
+            title=title,
+            company=company,
+            location=job_data.get("location", {}).get("display_name", "Unknown"),
+            description=description[:5000],
+            required_skills=", ".join(required_skills),
+            url=job_data.get("redirect_url", ""),
+            remote=bool(_REMOTE_RE.search(title) or _REMOTE_RE.search(description)),
+            salary_min=salary_min,
+            salary_max=salary_max,
+            job_type=JobType.FULL_TIME if _FULL_TIME_RE.search(description) else JobType.CONTRACT,
+            source="adzuna",
+            external_id=external_id,
+            expires_at=datetime.utcnow() + timedelta(days=30)
+        )
     
     def scrape_theirstack_jobs(self, limit: int = 30) -> int:
         """
         Scrape jobs from TheirStack (free, no auth)
         """
-        url = "https://api.theirstack.com/v1/jobs"
-        
         try:
-            logger.info("Fetching jobs from TheirStack...")
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            jobs = response.json()[:limit]
-            
-            added_count = 0
-            for job_data in jobs:
-                if self._save_theirstack_job(job_data):
-                    added_count += 1
-                    time.sleep(0.5)  # Be respectful with rate limiting
-            
-            logger.info(f"Added {added_count} jobs from TheirStack")
-            return added_count
-            
-        except Exception as e:
+            added = self._persist_theirstack_jobs(self._fetch_theirstack_jobs(limit))
+            self.db.commit()
+            return added
+        except requests.RequestException as e:
             logger.error(f"Error scraping TheirStack: {e}")
             return 0
     
-    def _save_theirstack_job(self, job_data: Dict) -> bool:
-        """Save a TheirStack job"""
-        try:
-            external_id = f"theirstack_{job_data.get('id', 'unknown')}"
-            existing = self.db.query(Job).filter_by(external_id=external_id).first()
-            
-            if existing:
-                return False
-            
-            title = job_data.get("title", "")
-            company = job_data.get("company", "Unknown")
-            
-            # Extract skills from tags
-            tags = job_data.get("tags", [])
-            required_skills = [tag for tag in tags if tag.lower() in self._get_known_skills()]
-            
-            job = Job(
-                title=title,
-                company=company,
-                location=job_data.get("location", "Unknown"),
-                description=job_data.get("description", "")[:5000],
-                required_skills=", ".join(required_skills),
-                url=job_data.get("url", ""),
-                remote=job_data.get("remote", False),
-                source="theirstack",
-                external_id=external_id,
-                expires_at=datetime.utcnow() + timedelta(days=30)
-            )
-            
-            self.db.add(job)
-            self.db.commit()
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error saving TheirStack job: {e}")
-            self.db.rollback()
-            return False
+    def _fetch_theirstack_jobs(self, limit: int = 30) -> List[Dict]:
+        url = "https://api.theirstack.com/v1/jobs"
+        
+        logger.info("Fetching jobs from TheirStack...")
+        response = self.session.get(url, timeout=10)
+        response.raise_for_status()
+        
+        return response.json()[:limit]
     
-    def _extract_skills_from_text(self, text: str) -> List[str]:
+    def _persist_theirstack_jobs(self, jobs: List[Dict]) -> int:
+        rows = self._build_rows(
+            self._build_theirstack_row, lambda j: f"theirstack_{j.get('id', 'unknown')}", jobs, "TheirStack"
+        )
+        added_count = self._insert_jobs(rows)
+        
+        logger.info(f"Added {added_count} jobs from TheirStack")
+        return added_count
+    
+    def _build_theirstack_row(self, job_data: Dict, external_id: str) -> Dict:
+        """Build a jobs row from a TheirStack job"""
+        title = job_data.get("title", "")
+        company = job_data.get("company") or "Unknown"
+        
+        # Extract skills from tags
+        tags = job_data.get("tags", [])
+        required_skills = [tag for tag in tags if tag.lower() in _KNOWN_SKILLS]
+        
+        return dict(
+            title=title,
+            company=company,
+            location=job_data.get("location", "Unknown"),
+            description=job_data.get("description", "")[:5000],
+            required_skills=", ".join(required_skills),
+            url=job_data.get("url", ""),
+            remote=job_data.get("remote", False),
+            job_type=JobType.FULL_TIME,
+            source="theirstack",
+            external_id=external_id,
+            expires_at=datetime.utcnow() + timedelta(days=30)
+        )
+    
+    def _build_rows(self, build, external_id, jobs: List[Dict], label: str) -> List[Dict]:
         """
-        Extract technical skills from job text
+        Build rows for the jobs of a source that aren't stored yet, skipping
+        (and logging) malformed entries. Existing external_ids are looked up
+        in one query so known jobs skip skill extraction entirely.
         """
-        text_lower = text.lower()
-        found_skills = []
+        by_id: Dict[str, Dict] = {}
+        for job_data in jobs:
+            try:
+                by_id.setdefault(external_id(job_data), job_data)
+            except Exception as e:
+                logger.error(f"Error parsing {label} job: {e}")
+        if not by_id:
+            return []
         
-        # Common technical skills to look for
-        skill_keywords = [
-            # Languages
-            'python', 'javascript', 'java', 'c++', 'c#', 'ruby', 'go', 'rust', 'php', 'swift',
-            'typescript', 'kotlin', 'scala', 'r', 'matlab', 'perl',
-            
-            # Frontend
-            'react', 'angular', 'vue', 'svelte', 'html', 'css', 'sass', 'jquery',
-            'webpack', 'babel', 'next.js', 'nuxt.js', 'gatsby',
-            
-            # Backend
-            'node.js', 'express', 'django', 'flask', 'fastapi', 'spring', 'rails',
-            '.net', 'laravel', 'symfony',
-            
-            # Databases
-            'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'elasticsearch',
-            'cassandra', 'dynamodb', 'oracle', 'sqlite',
-            
-            # Cloud & DevOps
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'terraform',
-            'ansible', 'gitlab', 'circleci', 'travis ci',
-            
-            # Other
-            'git', 'linux', 'rest api', 'graphql', 'microservices', 'ci/cd',
-            'machine learning', 'deep learning', 'tensorflow', 'pytorch'
-        ]
+        existing = {
+            ext_id for (ext_id,) in
+            self.db.query(Job.external_id).filter(Job.external_id.in_(list(by_id)))
+        }
         
-        for skill in skill_keywords:
-            if skill in text_lower:
-                found_skills.append(skill)
+        rows = []
+        for ext_id, job_data in by_id.items():
+            if ext_id in existing:
+                logger.debug(f"Job already exists: {ext_id}")
+                continue
+            try:
+                rows.append(build(job_data, ext_id))
+            except Exception as e:
+                logger.error(f"Error parsing {label} job: {e}")
+        return rows
+    
+    def _insert_jobs(self, rows: List[Dict]) -> int:
+        """
+        Insert all rows in one statement; jobs whose external_id already
+        exists are skipped by the unique index. Returns the number inserted.
+        Runs in a savepoint so a failed source doesn't poison the caller's
+        transaction, and re-raises so the failure shows up in that source's
+        result; committing is left to the caller.
+        """
+        if not rows:
+            return 0
         
-        return list(set(found_skills))[:10]  # Return max 10 skills
+        stmt = pg_insert(Job).values(rows).on_conflict_do_nothing(
+            index_elements=["external_id"]
+        )
+        try:
+            with self.db.begin_nested():
+                result = self.db.execute(stmt)
+        except Exception as e:
+            # the savepoint is already rolled back; let the source report the failure
+            logger.error(f"Error saving jobs: {e}")
+            raise
+        return result.rowcount
+    
+    def _extract_skills_from_text(self, text: str) -> List[str]:
+        """
+        Extract technical skills from job text (max 10, in order of appearance)
+        """
+        return terms_in_order(
+            _SKILL_AUTOMATON, text.lower(), limit=10, max_len=_SKILL_MAX_LEN
+        )
     
     def _parse_salary(self, salary_str: str) -> tuple[Optional[int], Optional[int]]:
         """
@@ -416,10 +415,8 @@ class JobScraperService:
         if not salary_str:
             return None, None
         
-        import re
-        
         # Look for numbers in the string
-        numbers = re.findall(r'\$?(\d{1,3}(?:,\d{3})*(?:k)?)', salary_str)
+        numbers = _SALARY_RE.findall(salary_str)
         
         if not numbers:
             return None, None
@@ -427,8 +424,8 @@ class JobScraperService:
         # Convert to integers
         salaries = []
         for num in numbers:
-            num = num.replace(',', '').replace('$', '')
-            if 'k' in num.lower():
+            num = num.replace(',', '').replace('$', '').lower()
+            if 'k' in num:
                 salaries.append(int(float(num.replace('k', '')) * 1000))
             else:
                 value = int(num)
@@ -448,21 +445,12 @@ class JobScraperService:
         """
         Determine experience level from job title
         """
-        title_lower = title.lower()
+        levels = {_EXP_LEVELS[m] for m in _EXP_RE.findall(title.lower())}
         
-        if any(word in title_lower for word in ['senior', 'sr.', 'lead', 'principal']):
+        # Senior wins over junior when a title mentions both
+        if ExperienceLevel.SENIOR in levels:
             return ExperienceLevel.SENIOR
-        elif any(word in title_lower for word in ['junior', 'jr.', 'entry']):
+        elif ExperienceLevel.JUNIOR in levels:
             return ExperienceLevel.JUNIOR
-        elif any(word in title_lower for word in ['mid-level', 'mid level']):
-            return ExperienceLevel.MID
         else:
             return ExperienceLevel.MID  # Default
-    
-    def _get_known_skills(self) -> set:
-        """Get list of known skills for matching"""
-        return {
-            'python', 'javascript', 'java', 'react', 'angular', 'vue',
-            'django', 'flask', 'node.js', 'express', 'sql', 'mongodb',
-            'aws', 'docker', 'kubernetes', 'git', 'api', 'rest'
-        }
\ No newline at end of file
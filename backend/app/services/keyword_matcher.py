@@ -0,0 +1,79 @@
+# app/services/keyword_matcher.py
+
+"""
+Multi-pattern keyword search over free text.
+
+Builds a single Aho-Corasick automaton for a skill vocabulary so a text is
+scanned once regardless of how many terms are known. A hit only counts as
+a whole word when it isn't glued to a word character on either side, i.e.
+``(?<!\\w)term(?!\\w)``. Unlike ``\\b...\\b`` this also finds terms that
+begin or end with punctuation, such as ".net", "c++" or "c#".
+"""
+
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+import ahocorasick
+
+
+def build_automaton(terms: Iterable[str]) -> Optional[ahocorasick.Automaton]:
+    """Build an automaton over non-empty terms; None when there are none."""
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        if term:
+            automaton.add_word(term, term)
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=8)
+def automaton_for(terms: FrozenSet[str]) -> Optional[ahocorasick.Automaton]:
+    """Cached build_automaton for vocabularies that are reloaded as sets."""
+    return build_automaton(terms)
+
+
+def _is_word(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    """text[start:end + 1] has no word character right before or after it."""
+    if start > 0 and _is_word(text[start - 1]):
+        return False
+    return end + 1 >= len(text) or not _is_word(text[end + 1])
+
+
+def find_terms(automaton: Optional[ahocorasick.Automaton], text: str) -> Iterator[Tuple[int, str]]:
+    """Yield (start, term) for each whole-word hit, ordered by end position."""
+    if automaton is None or not text:
+        return
+    for end, term in automaton.iter(text):
+        start = end - len(term) + 1
+        if _is_whole_word(text, start, end):
+            yield start, term
+
+
+def terms_in_order(
+    automaton: Optional[ahocorasick.Automaton],
+    text: str,
+    limit: Optional[int] = None,
+    max_len: int = 0,
+) -> List[str]:
+    """
+    Distinct whole-word terms in order of first appearance in text.
+    With `limit` (and `max_len`, the longest term in the automaton) the scan
+    stops as soon as the first `limit` terms can no longer change.
+    """
+    hits = []
+    for start, term in find_terms(automaton, text):
+        hits.append((start, term))
+        if limit is not None and len(hits) >= limit:
+            # hits arrive by end position, so no later hit starts before this
+            frontier = start + len(term) - max_len
+            if len({t for s, t in hits if s < frontier}) >= limit:
+                break
+    hits.sort(key=lambda h: (h[0], -len(h[1])))
+    terms = list(dict.fromkeys(term for _, term in hits))
+    return terms if limit is None else terms[:limit]
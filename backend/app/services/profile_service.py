@@ -1,10 +1,11 @@
 from typing import Optional, List
+from sqlalchemy import delete, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-import json
 from datetime import datetime
 
-from app.db.models import Profile
+from app.db.models import Profile, ProfileSkill, SkillMaster
 from app.db.models import User
 from app.schemas.profile import ProfileCreate, ProfileUpdate, ProfileStats
 
@@ -33,8 +34,7 @@ class ProfileService:
         )
         
         # Calculate completion percentage
-        db_profile.completion_percentage = db_profile.calculate_completion()
-        db_profile.is_complete = db_profile.completion_percentage >= 80
+        db_profile.completion_percentage, db_profile.is_complete = db_profile.calculate_completion()
         
         db.add(db_profile)
         db.commit()
@@ -60,14 +60,33 @@ class ProfileService:
             setattr(profile, field, value)
         
         # Recalculate completion
-        profile.completion_percentage = profile.calculate_completion()
-        profile.is_complete = profile.completion_percentage >= 80
+        has_skills = db.execute(
+            select(exists().where(ProfileSkill.profile_id == profile.id))
+        ).scalar_one()
+        profile.completion_percentage, profile.is_complete = profile.calculate_completion(has_skills)
         profile.updated_at = datetime.utcnow()
         
         db.commit()
         db.refresh(profile)
         return profile
     
+    @staticmethod
+    def get_skill_names(db: Session, profile_id: int) -> List[str]:
+        """Skill names on a profile, alphabetically"""
+        stmt = (
+            select(SkillMaster.name)
+            .join(ProfileSkill, ProfileSkill.skill_id == SkillMaster.id)
+            .where(ProfileSkill.profile_id == profile_id)
+            .order_by(SkillMaster.name)
+        )
+        return list(db.execute(stmt).scalars())
+    
+    @staticmethod
+    def count_skills(db: Session, profile_id: int) -> int:
+        """Number of skills on a profile"""
+        stmt = select(func.count()).where(ProfileSkill.profile_id == profile_id)
+        return db.execute(stmt).scalar_one()
+    
     @staticmethod
     def add_skills(
         db: Session, 
@@ -82,17 +101,31 @@ class ProfileService:
                 db, user_id, ProfileCreate()
             )
         
-        # Parse existing skills
-        existing_skills = []
-        if profile.skills:
-            try:
-                existing_skills = json.loads(profile.skills)
-            except json.JSONDecodeError:
-                existing_skills = []
-        
-        # Add new unique skills
-        all_skills = list(set(existing_skills + skills))
-        profile.skills = json.dumps(all_skills)
+        names = sorted({s.strip().lower() for s in skills if s and s.strip()})
+        if not names:
+            return profile
+        
+        # Resolve names against SkillMaster case-insensitively so "Python"
+        # links to the seeded row. Unknown names get an unverified
+        # source="profile" row, which the extractors leave out of their vocabulary
+        lowered = func.lower(SkillMaster.name)
+        known = set(db.execute(select(lowered).where(lowered.in_(names))).scalars())
+        missing = [n for n in names if n not in known]
+        if missing:
+            db.execute(
+                pg_insert(SkillMaster)
+                .values([{"name": n, "source": "profile", "is_verified": False} for n in missing])
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+        # one row per name, preferring vocabulary rows over profile-only ones
+        link = pg_insert(ProfileSkill).from_select(
+            ["profile_id", "skill_id"],
+            select(literal(profile.id), SkillMaster.id)
+            .where(lowered.in_(names))
+            .distinct(lowered)
+            .order_by(lowered, SkillMaster.source.is_not_distinct_from("profile"), SkillMaster.id),
+        )
+        db.execute(link.on_conflict_do_nothing())
         profile.updated_at = datetime.utcnow()
         
         db.commit()
@@ -114,17 +147,15 @@ class ProfileService:
                 detail="Profile not found"
             )
         
-        if profile.skills:
-            try:
-                skills = json.loads(profile.skills)
-                if skill in skills:
-                    skills.remove(skill)
-                    profile.skills = json.dumps(skills)
-                    profile.updated_at = datetime.utcnow()
-                    db.commit()
-                    db.refresh(profile)
-            except json.JSONDecodeError:
-                pass
+        skill_ids = select(SkillMaster.id).where(func.lower(SkillMaster.name) == skill.strip().lower())
+        result = db.execute(
+            delete(ProfileSkill)
+            .where(ProfileSkill.profile_id == profile.id, ProfileSkill.skill_id.in_(skill_ids))
+        )
+        if result.rowcount:
+            profile.updated_at = datetime.utcnow()
+            db.commit()
+            db.refresh(profile)
         
         return profile
     
@@ -142,16 +173,9 @@ class ProfileService:
                 last_updated=None
             )
         
-        skills_count = 0
-        if profile.skills:
-            try:
-                skills_count = len(json.loads(profile.skills))
-            except json.JSONDecodeError:
-                skills_count = 0
-        
         return ProfileStats(
             profile_completion=profile.completion_percentage,
-            total_skills=skills_count,
+            total_skills=ProfileService.count_skills(db, profile.id),
             has_resume=bool(profile.resume_path),
             has_github=bool(profile.github_username),
             last_updated=profile.updated_at or profile.created_at
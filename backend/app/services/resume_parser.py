@@ -1,38 +1,46 @@
-import re
+from typing import Union
+
 import fitz  # PyMuPDF
-import spacy
 from sqlalchemy.orm import Session
-from app.db.models import SkillMaster   # ✅ Import your SkillMaster ORM model
-
-nlp = spacy.load("en_core_web_sm")
-
-# ✅ Extract text from PDF
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
-    with fitz.open(file_path) as pdf:
-        for page in pdf:
-            text += page.get_text()
-    return text
-
-
-# ✅ Load dynamic skills from DB
-def load_dynamic_skills(db: Session) -> set[str]:
-    skills = db.query(SkillMaster.name).all()
-    return {s[0].lower() for s in skills}
+from app.services.keyword_matcher import automaton_for, find_terms
+# ✅ One SkillMaster cache, shared with skill_extractor
+from app.services.skill_extractor import load_dynamic_skills
+
+# ✅ Extract text from PDF (a path on disk, or the raw bytes of an upload)
+def extract_text_from_pdf(source: Union[str, bytes]) -> str:
+    if isinstance(source, bytes):
+        pdf = fitz.open(stream=source, filetype="pdf")
+    else:
+        pdf = fitz.open(source)
+    # plain-text extraction per page, joined once (no quadratic +=).
+    # Pages are read sequentially on purpose: MuPDF holds the GIL and
+    # PyMuPDF documents are not thread-safe, so a thread pool over pages
+    # adds overhead without parallelism. Resumes parse in parallel across
+    # Celery worker processes instead.
+    with pdf:
+        return "\n".join(page.get_text("text") for page in pdf)
 
 
 # ✅ Extract skills (basic version using dictionary matching)
 def extract_skills(text: str, db: Session) -> list[str]:
     text_lower = text.lower()
-    existing_skills = load_dynamic_skills(db)
-    found = {skill for skill in existing_skills if re.search(rf"\b{re.escape(skill)}\b", text_lower)}
+    automaton = automaton_for(load_dynamic_skills(db))
+    found = {skill for _, skill in find_terms(automaton, text_lower)}
     return list(found)
 
 
-# ✅ Save new skills dynamically if they are not already in the DB
-def save_new_skills(extracted: set, db: Session):
-    existing = load_dynamic_skills(db)
-    for skill in extracted:
-        if skill not in existing:
-            db.add(SkillMaster(name=skill))
-    db.commit()
+# ✅ Full parse of an uploaded resume: one text extraction, one skill scan
+def parse_resume(file_content: bytes, filename: str, db: Session) -> dict:
+    text = extract_text_from_pdf(file_content)
+    return {
+        "text": text,
+        "skills": extract_skills(text, db),
+        "filename": filename,
+    }
+
+
+# ✅ Worker start-up: pay one-off initialization before the first resume
+def warm_up(db: Session) -> None:
+    """Load the skill vocabulary, build its automaton and initialize MuPDF."""
+    automaton_for(load_dynamic_skills(db))
+    fitz.open().close()
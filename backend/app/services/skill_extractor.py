@@ -1,11 +1,28 @@
 # app/services/skill_extractor.py
 import re
+import time
 import spacy
-from typing import Iterable, List, Set
+from functools import lru_cache
+from spacy.matcher import PhraseMatcher
+from typing import FrozenSet, Iterable, List, Optional, Set
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.db.models import SkillMaster
 
-nlp = spacy.load("en_core_web_sm")
+_nlp = None
+
+def _get_nlp():
+    """Load the spaCy model on first use, so importing this module stays cheap."""
+    global _nlp
+    if _nlp is None:
+        # Only NER and noun chunks are consumed; noun_chunks needs the POS tags
+        # that attribute_ruler sets, so the lemmatizer is the only pipe we can drop
+        _nlp = spacy.load("en_core_web_sm", disable=["lemmatizer"])
+    return _nlp
+
+# Noun chunks kept as skill candidates; whitespace runs collapsed by clean_skills
+_TOKEN_RE = re.compile(r"^[a-z0-9\-\.\+ ]+$")
+_WS_RE = re.compile(r"\s+")
 
 ALIASES = {
     "reactjs": "react",
@@ -16,20 +33,41 @@ ALIASES = {
     "js": "javascript",
 }
 
-def load_dynamic_skills(db: Session) -> set[str]:
-    skills = db.query(SkillMaster.name).all()
-    return {s[0].lower() for s in skills}
+# SkillMaster names, memoized per process; save_new_skills invalidates it
+SKILLS_CACHE_TTL = 300  # seconds
+_skills_cache: Optional[FrozenSet[str]] = None
+_skills_loaded_at = 0.0
+
+def load_dynamic_skills(db: Session) -> FrozenSet[str]:
+    global _skills_cache, _skills_loaded_at
+    if _skills_cache is None or time.monotonic() - _skills_loaded_at > SKILLS_CACHE_TTL:
+        # profile-only rows are user free text, not extraction vocabulary
+        names = db.query(SkillMaster.name).filter(SkillMaster.source.is_distinct_from("profile"))
+        _skills_cache = frozenset(name.lower() for (name,) in names)
+        _skills_loaded_at = time.monotonic()
+    return _skills_cache
+
+def invalidate_skills_cache() -> None:
+    global _skills_cache
+    _skills_cache = None
+
+@lru_cache(maxsize=2)
+def _phrase_matcher_for(skills: FrozenSet[str]) -> PhraseMatcher:
+    """Case-insensitive matcher over a vocabulary; rebuilt only when the vocabulary changes."""
+    nlp = _get_nlp()
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    matcher.add("SKILL", list(nlp.tokenizer.pipe(skills)))
+    return matcher
 
 def extract_skills(text: str, db: Session) -> list[str]:
-    text_lower = text.lower()
-    doc = nlp(text)
+    doc = _get_nlp()(text)
     dynamic_skills = load_dynamic_skills(db)
     extracted: Set[str] = set()
 
-    # 1) Exact matches from master
-    for skill in dynamic_skills:
-        if re.search(rf"\b{re.escape(skill)}\b", text_lower):
-            extracted.add(skill)
+    # 1) Exact matches from master (one token pass over the parsed doc)
+    if dynamic_skills:
+        matcher = _phrase_matcher_for(dynamic_skills)
+        extracted.update(doc[start:end].text.lower() for _, start, end in matcher(doc))
 
     # 2) NER candidates
     for ent in doc.ents:
@@ -44,7 +82,7 @@ def extract_skills(text: str, db: Session) -> list[str]:
         if (
             2 < len(token) < 40
             and token not in extracted
-            and re.match(r"^[a-z0-9\-\.\+ ]+$", token)
+            and _TOKEN_RE.match(token)
         ):
             extracted.add(token)
 
@@ -57,7 +95,7 @@ def clean_skills(raw: Iterable[str]) -> List[str]:
     for s in raw:
         if not s:
             continue
-        t = re.sub(r"\s+", " ", s.strip().lower())
+        t = _WS_RE.sub(" ", s.strip().lower())
         t = ALIASES.get(t, t)
         if t and t not in seen:
             seen.add(t)
@@ -65,9 +103,11 @@ def clean_skills(raw: Iterable[str]) -> List[str]:
     return out
 
 def save_new_skills(candidates: Iterable[str], db: Session) -> None:
-    """Optionally expand SkillMaster from extracted skills."""
-    existing = load_dynamic_skills(db)
-    to_add = [SkillMaster(name=s) for s in candidates if s not in existing]
-    if to_add:
-        db.add_all(to_add)
-        db.commit()
+    """Optionally expand SkillMaster from extracted skills (one INSERT ... ON CONFLICT DO NOTHING)."""
+    names = sorted({s for s in candidates if s})
+    if not names:
+        return
+    stmt = pg_insert(SkillMaster).values([{"name": n} for n in names])
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["name"]))
+    db.commit()
+    invalidate_skills_cache()
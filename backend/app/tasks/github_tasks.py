@@ -1,37 +1,30 @@
-from celery import Task
+from celery import Task, group
+from sqlalchemy import func, insert, or_
 from app.core.celery_app import celery_app
-from app.db.session import SessionLocal
+from app.db.session import TaskSession
 from app.db.models import User, Skill, TaskStatus
 from app.services.github_analyzer import GitHubAnalyzer
+from app.tasks.progress import report_progress
 import logging
+from bisect import bisect_right
+from itertools import islice
 from datetime import datetime, timedelta
 from typing import Dict, List
 
 logger = logging.getLogger(__name__)
 
-# Reuse CallbackTask from resume_tasks or define it here
+# Users fetched and published per group by update_all_github_profiles_task
+GITHUB_SCHEDULE_BATCH_SIZE = 500
+
 class CallbackTask(Task):
-    """Base task with callbacks for status tracking"""
-    def on_success(self, retval, task_id, args, kwargs):
-        """Success callback - update task status to completed"""
-        db = SessionLocal()
-        try:
-            task_status = db.query(TaskStatus).filter(
-                TaskStatus.task_id == task_id
-            ).first()
-            if task_status:
-                task_status.status = "completed"
-                task_status.result = retval
-                task_status.completed_at = datetime.utcnow()
-                db.commit()
-        except Exception as e:
-            logger.error(f"Error updating task success status: {str(e)}")
-        finally:
-            db.close()
-    
+    """
+    Base task that marks TaskStatus failed when the task raises. The
+    success status is written by the task body itself, in the same
+    transaction as its results, so no second session is opened.
+    """
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Failure callback - update task status to failed"""
-        db = SessionLocal()
+        db = TaskSession()
         try:
             task_status = db.query(TaskStatus).filter(
                 TaskStatus.task_id == task_id
@@ -39,15 +32,16 @@ class CallbackTask(Task):
             if task_status:
                 task_status.status = "failed"
                 task_status.error = str(exc)
-                task_status.completed_at = datetime.utcnow()
+                # stamped by Postgres, as naive UTC like the other columns
+                task_status.completed_at = func.timezone("utc", func.now())
                 db.commit()
         except Exception as e:
             logger.error(f"Error updating task failure status: {str(e)}")
         finally:
-            db.close()
+            TaskSession.remove()
 
 
-@celery_app.task(base=CallbackTask, bind=True, name="analyze_github")
+@celery_app.task(base=CallbackTask, bind=True, name="analyze_github", track_started=False)
 def analyze_github_profile_task(self, user_id: int):
     """
     Analyze GitHub profile in background
@@ -61,7 +55,7 @@ def analyze_github_profile_task(self, user_id: int):
     """
     logger.info(f"Starting GitHub analysis for user {user_id}")
     
-    db = SessionLocal()
+    db = TaskSession()
     try:
         # Create or update task status
         task_status = db.query(TaskStatus).filter(
@@ -90,25 +84,13 @@ def analyze_github_profile_task(self, user_id: int):
             raise ValueError(f"User {user_id} has no GitHub username")
         
         # Update progress: Starting
-        self.update_state(
-            state="PROCESSING", 
-            meta={
-                "progress": 10,
-                "message": f"Fetching GitHub profile for {user.github_username}..."
-            }
-        )
+        report_progress(self, 10, f"Fetching GitHub profile for {user.github_username}...")
         
         # Initialize GitHub analyzer
-        analyzer = GitHubAnalyzer()
+        analyzer = GitHubAnalyzer(db)
         
         # Update progress: Analyzing
-        self.update_state(
-            state="PROCESSING", 
-            meta={
-                "progress": 30,
-                "message": "Analyzing repositories..."
-            }
-        )
+        report_progress(self, 30, "Analyzing repositories...")
         
         # Analyze GitHub profile
         try:
@@ -118,84 +100,60 @@ def analyze_github_profile_task(self, user_id: int):
             raise Exception(f"Failed to analyze GitHub profile: {str(e)}")
         
         # Update progress: Processing languages
-        self.update_state(
-            state="PROCESSING", 
-            meta={
-                "progress": 60,
-                "message": "Processing programming languages..."
-            }
-        )
-        
-        # Clear existing GitHub skills
-        deleted_count = db.query(Skill).filter(
-            Skill.user_id == user_id,
-            Skill.source == "github"
-        ).delete()
-        logger.info(f"Deleted {deleted_count} existing GitHub skills for user {user_id}")
+        report_progress(self, 60, "Processing programming languages...")
         
         # Update progress: Saving skills
-        self.update_state(
-            state="PROCESSING", 
-            meta={
-                "progress": 80,
-                "message": "Saving skills to database..."
-            }
-        )
+        report_progress(self, 80, "Saving skills to database...")
         
-        # Add language skills based on usage
-        skills_added = 0
+        # Language skills with significant usage (more than 5% of code),
+        # then framework/library skills from the repo analysis
+        rows = []
         skills_list = []
-        
         for lang, stats in analysis.get("languages", {}).items():
-            # Only add languages with significant usage
-            if stats["percentage"] > 5:  # More than 5% of code
-                skill_name = f"github_{lang.lower()}"
-                proficiency = _calculate_proficiency(stats["percentage"])
-                
-                skill = Skill(
-                    user_id=user_id,
-                    name=skill_name,
-                    source="github",
-                    proficiency=proficiency
-                )
-                db.add(skill)
-                skills_added += 1
+            if stats["percentage"] > 5:
+                rows.append({
+                    "user_id": user_id,
+                    "name": f"github_{lang.lower()}",
+                    "source": "github",
+                    "proficiency": _calculate_proficiency(stats["percentage"])
+                })
                 skills_list.append(lang)
         
-        # Add framework/library skills based on repo analysis
         for framework in analysis.get("frameworks", []):
-            skill = Skill(
-                user_id=user_id,
-                name=f"github_{framework.lower()}",
-                source="github",
-                proficiency="intermediate"
-            )
-            db.add(skill)
-            skills_added += 1
+            rows.append({
+                "user_id": user_id,
+                "name": f"github_{framework.lower()}",
+                "source": "github",
+                "proficiency": "intermediate"
+            })
             skills_list.append(framework)
+        skills_added = len(rows)
         
-        # Update user's github_data field
-        user.github_data = {
+        # Replace the user's GitHub skills: one DELETE and one multi-row
+        # INSERT, committed together with github_profile below
+        deleted_count = db.query(Skill).filter(
+            Skill.user_id == user_id,
+            Skill.source == "github"
+        ).delete(synchronize_session=False)
+        logger.info(f"Deleted {deleted_count} existing GitHub skills for user {user_id}")
+        
+        if rows:
+            db.execute(insert(Skill), rows)
+        
+        # Rewrite the GitHub summary only when it changed; the timestamp
+        # has its own column so unchanged profiles don't reserialize the JSON
+        github_profile = {
             "username": user.github_username,
             "repos_count": analysis.get("repos_count", 0),
             "total_stars": analysis.get("total_stars", 0),
             "followers": analysis.get("followers", 0),
             "top_languages": analysis.get("top_languages", []),
             "languages": analysis.get("languages", {}),
-            "last_updated": datetime.utcnow().isoformat(),
             "profile_url": f"https://github.com/{user.github_username}"
         }
-        
-        db.commit()
-        
-        # Update progress: Complete
-        self.update_state(
-            state="PROCESSING", 
-            meta={
-                "progress": 100,
-                "message": "GitHub analysis completed!"
-            }
-        )
+        if user.github_profile != github_profile:
+            user.github_profile = github_profile
+        user.github_last_analyzed_at = datetime.utcnow()
         
         # Prepare result
         result = {
@@ -204,11 +162,20 @@ def analyze_github_profile_task(self, user_id: int):
             "repos_analyzed": analysis.get("repos_count", 0),
             "skills_extracted": skills_added,
             "skills_list": skills_list[:10],  # Top 10 skills
-            "top_language": analysis.get("top_languages", ["None"])[0],
+            "top_language": (analysis.get("top_languages") or ["None"])[0],
             "total_stars": analysis.get("total_stars", 0),
             "processed_at": datetime.utcnow().isoformat()
         }
         
+        # Mark the task completed in the same commit as the skills
+        task_status.status = "completed"
+        task_status.result = result
+        task_status.completed_at = func.timezone("utc", func.now())
+        db.commit()
+        
+        # Update progress: Complete
+        report_progress(self, 100, "GitHub analysis completed!")
+        
         logger.info(f"GitHub analysis completed for user {user_id}: {skills_added} skills added")
         return result
         
@@ -217,19 +184,17 @@ def analyze_github_profile_task(self, user_id: int):
         raise
         
     finally:
-        db.close()
+        TaskSession.remove()
+
+
+# Language-share (%) lower bounds for each proficiency above "beginner"
+_PROF_THRESHOLDS = (15, 30, 50)
+_PROF_LABELS = ("beginner", "intermediate", "advanced", "expert")
 
 
 def _calculate_proficiency(percentage: float) -> str:
     """Calculate proficiency level based on language usage percentage"""
-    if percentage >= 50:
-        return "expert"
-    elif percentage >= 30:
-        return "advanced"
-    elif percentage >= 15:
-        return "intermediate"
-    else:
-        return "beginner"
+    return _PROF_LABELS[bisect_right(_PROF_THRESHOLDS, percentage)]
 
 
 @celery_app.task(name="update_all_github_profiles")
@@ -238,45 +203,47 @@ def update_all_github_profiles_task():
     Batch update all users' GitHub profiles
     (For Airflow daily updates)
     """
-    db = SessionLocal()
+    db = TaskSession()
     try:
-        # Get all users with GitHub usernames
-        users = db.query(User).filter(
+        # Stream just the columns the scheduling needs, and only for users
+        # not analyzed within the last 24 hours
+        cutoff = datetime.utcnow() - timedelta(hours=24)
+        query = db.query(User.id, User.github_username).filter(
             User.github_username.isnot(None),
-            User.is_active == True
-        ).all()
+            User.is_active == True,
+            or_(
+                User.github_last_analyzed_at.is_(None),
+                User.github_last_analyzed_at < cutoff
+            )
+        ).yield_per(GITHUB_SCHEDULE_BATCH_SIZE)
+        users = iter(query)  # one cursor, consumed slice by slice
         
         results = []
-        for user in users:
-            try:
-                # Check if recently updated (within 24 hours)
-                if user.github_data:
-                    last_updated = user.github_data.get("last_updated")
-                    if last_updated:
-                        last_update_time = datetime.fromisoformat(last_updated)
-                        if datetime.utcnow() - last_update_time < timedelta(hours=24):
-                            logger.info(f"Skipping user {user.id} - recently updated")
-                            continue
-                
-                # Schedule individual analysis task
-                task = analyze_github_profile_task.delay(user.id)
+        group_ids = []
+        
+        # Publish one group per fetched slice, so the broker fans analyses
+        # out across workers without one .delay() round trip per user, and
+        # no more than one slice of rows is held at a time
+        while True:
+            batch = list(islice(users, GITHUB_SCHEDULE_BATCH_SIZE))
+            if not batch:
+                break
+            group_result = group(
+                analyze_github_profile_task.s(user.id) for user in batch
+            ).apply_async()
+            group_ids.append(group_result.id)
+            for user, task in zip(batch, group_result.results):
                 results.append({
                     "user_id": user.id,
                     "task_id": task.id,
                     "github_username": user.github_username
                 })
-                
-            except Exception as e:
-                logger.error(f"Error scheduling GitHub update for user {user.id}: {str(e)}")
-                results.append({
-                    "user_id": user.id,
-                    "error": str(e)
-                })
         
         return {
             "users_scheduled": len(results),
+            "group_ids": group_ids,
             "results": results
         }
         
     finally:
-        db.close()
\ No newline at end of file
+        TaskSession.remove()
\ No newline at end of file
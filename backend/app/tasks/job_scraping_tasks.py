@@ -1,74 +1,95 @@
-from celery import group
+from celery import chord
+from sqlalchemy import or_
 from app.core.celery_app import celery_app
-from app.db.session import SessionLocal
+from app.db.session import TaskSession
+from app.core.cache import cache_manager
 from app.services.job_scraper import JobScraperService
-from app.tasks.matching_tasks import match_jobs_batch_task
+from app.tasks.matching_tasks import match_jobs_batch_task, invalidate_job_count
 import logging
 from datetime import datetime, timedelta
+from typing import Dict, List
 
 logger = logging.getLogger(__name__)
 
+# Rows per cleanup DELETE; each batch commits so locks are held briefly
+CLEANUP_BATCH_SIZE = 10000
+
+# Sources scraped by scrape_all_jobs_task, one scrape_specific_source task each
+SCRAPE_SOURCES = ("arbeitnow", "remotive", "adzuna", "theirstack")
+
 @celery_app.task(name="scrape_all_jobs")
 def scrape_all_jobs_task():
     """
-    Main task to scrape jobs from all sources
+    Main task to scrape jobs from all sources: one subtask per source runs
+    in parallel, and post_scrape_trigger totals them once all have finished
     """
     logger.info("Starting job scraping task...")
     
-    db = SessionLocal()
-    try:
-        scraper = JobScraperService(db)
-        results = scraper.scrape_all_sources()
-        
-        total_jobs = sum([
-            results.get("remotive", 0),
-            results.get("adzuna", 0),
-            results.get("theirstack", 0)
-        ])
-        
-        logger.info(f"Job scraping completed. Total new jobs: {total_jobs}")
-        
-        # If new jobs were added, trigger matching for all users
-        if total_jobs > 0:
-            logger.info("New jobs found, triggering batch matching...")
-            match_jobs_batch_task.delay()
-        
-        return {
-            "status": "success",
-            "timestamp": datetime.utcnow().isoformat(),
-            "results": results,
-            "total_new_jobs": total_jobs
-        }
-        
-    except Exception as e:
-        logger.error(f"Error in job scraping task: {e}")
-        return {
-            "status": "error",
-            "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    finally:
-        db.close()
+    summary = chord(
+        scrape_specific_source_task.s(source) for source in SCRAPE_SOURCES
+    )(post_scrape_trigger_task.s())
+    
+    return {
+        "status": "scheduled",
+        "sources": list(SCRAPE_SOURCES),
+        "summary_task_id": summary.id,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@celery_app.task(name="post_scrape_trigger")
+def post_scrape_trigger_task(source_results: List[Dict]) -> Dict:
+    """
+    Chord callback: total the per-source counts and start batch matching
+    when anything new was added
+    """
+    results = {r["source"]: r.get("jobs_added", 0) for r in source_results}
+    results["errors"] = [
+        f"{r['source']}: {r['error']}" for r in source_results if r["status"] == "error"
+    ]
+    total_jobs = sum(r.get("jobs_added", 0) for r in source_results)
+    
+    logger.info(f"Job scraping completed. Total new jobs: {total_jobs}")
+    
+    # If new jobs were added, trigger matching for all users
+    if total_jobs > 0:
+        # Invalidate job match caches after new jobs
+        cache_manager.delete_pattern("user_matches:*")  # keyed in api/endpoints/jobs.py
+        logger.info("New jobs found, triggering batch matching...")
+        match_jobs_batch_task.delay()
+    
+    return {
+        "status": "success",
+        "timestamp": datetime.utcnow().isoformat(),
+        "results": results,
+        "total_new_jobs": total_jobs
+    }
 
 @celery_app.task(name="cleanup_expired_jobs")
 def cleanup_expired_jobs_task():
     """
     Remove jobs that have expired
     """
-    db = SessionLocal()
+    db = TaskSession()
     try:
-        from app.db.models import Job
+        from app.db.models import Job, Match
         
         # Delete jobs older than 60 days or past expiration
-        cutoff_date = datetime.utcnow() - timedelta(days=60)
-        
-        expired_count = db.query(Job).filter(
-            (Job.expires_at < datetime.utcnow()) | 
-            (Job.created_at < cutoff_date)
-        ).delete()
+        now = datetime.utcnow()
+        cutoff_date = now - timedelta(days=60)
+        expired = or_(Job.expires_at < now, Job.created_at < cutoff_date)
         
-        db.commit()
+        expired_count = 0
+        while True:
+            ids = [job_id for (job_id,) in db.query(Job.id).filter(expired).limit(CLEANUP_BATCH_SIZE)]
+            if not ids:
+                break
+            # matches reference jobs without ON DELETE CASCADE
+            db.query(Match).filter(Match.job_id.in_(ids)).delete(synchronize_session=False)
+            expired_count += db.query(Job).filter(Job.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
         
+        if expired_count:
+            invalidate_job_count()
         logger.info(f"Cleaned up {expired_count} expired jobs")
         
         return {
@@ -82,18 +103,20 @@ def cleanup_expired_jobs_task():
         db.rollback()
         return {"status": "error", "error": str(e)}
     finally:
-        db.close()
+        TaskSession.remove()
 
 @celery_app.task(name="scrape_specific_source")
 def scrape_specific_source_task(source: str):
     """
     Scrape jobs from a specific source
     """
-    db = SessionLocal()
+    db = TaskSession()
     try:
         scraper = JobScraperService(db)
         
-        if source == "remotive":
+        if source == "arbeitnow":
+            count = scraper.scrape_arbeitnow_jobs()
+        elif source == "remotive":
             count = scraper.scrape_remotive_jobs()
         elif source == "adzuna":
             count = scraper.scrape_adzuna_jobs()
@@ -103,6 +126,8 @@ def scrape_specific_source_task(source: str):
             raise ValueError(f"Unknown source: {source}")
         
         logger.info(f"Scraped {count} jobs from {source}")
+        if count > 0:
+            invalidate_job_count()
         
         return {
             "status": "success",
@@ -119,7 +144,7 @@ def scrape_specific_source_task(source: str):
             "error": str(e)
         }
     finally:
-        db.close()
+        TaskSession.remove()
 
 # Update celery beat schedule
 from celery.schedules import crontab
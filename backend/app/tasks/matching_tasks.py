@@ -1,42 +1,86 @@
-from celery import group
+from celery import chord, group
 from app.core.celery_app import celery_app
-from app.db.session import SessionLocal
-from app.db.models import User, Job, Match
+from app.db.session import TaskSession
+from app.core.cache import cache_manager, redis_client
+from sqlalchemy import func
+from app.db.models import User, Job, Match, Skill
 from app.services.job_matcher import JobMatcher
+from app.tasks.progress import report_progress
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Users per match_users_chunk_task in a batch
+MATCH_CHUNK_SIZE = 50
+
+# Redis key for the cached jobs-table count; cleared when jobs are added or removed
+JOB_COUNT_CACHE_KEY = "job:count"
+JOB_COUNT_TTL = 3600
+
+
+def get_job_count(db) -> int:
+    """Job count from Redis, falling back to COUNT(*) and caching the result"""
+    job_count = cache_manager.get(JOB_COUNT_CACHE_KEY)
+    if job_count is None:
+        job_count = db.query(Job).count()
+        # an empty table isn't cached, so the first jobs are seen right away
+        # even if a writer forgets invalidate_job_count
+        if job_count:
+            cache_manager.set(JOB_COUNT_CACHE_KEY, job_count, ttl=JOB_COUNT_TTL)
+    return job_count
+
+
+def invalidate_job_count():
+    """Drop the cached job count after the jobs table changes"""
+    cache_manager.delete(JOB_COUNT_CACHE_KEY)
+
+
+# Redis lock that keeps overlapping refresh_stale_matches runs from
+# scheduling the same users twice
+REFRESH_STALE_LOCK_KEY = "lock:refresh_stale"
+REFRESH_STALE_LOCK_TTL = 600
+
 
 @celery_app.task(name="match_jobs_batch")
-def match_jobs_batch_task(user_ids: Optional[List[int]] = None):
+def match_jobs_batch_task(user_ids: Optional[List[int]] = None, skip_user_requery: bool = False):
     """
     Run job matching for multiple users (batch processing)
     Used by Airflow for scheduled matching
     
     Args:
         user_ids: Optional list of user IDs. If None, process all active users
+        skip_user_requery: user_ids was already filtered by the caller (active,
+            has skills); match them as-is without querying users again
         
     Returns:
-        dict: Summary of matching results
+        dict: Scheduling info; the full summary is the result of the
+        summarize_matches chord callback (summary_task_id)
     """
     logger.info(f"Starting batch job matching for users: {user_ids or 'all'}")
     
-    db = SessionLocal()
+    db = TaskSession()
     try:
-        # Get users to process
-        query = db.query(User).filter(User.is_active == True)
-        
-        if user_ids:
-            query = query.filter(User.id.in_(user_ids))
-        
-        users = query.all()
+        if skip_user_requery and user_ids:
+            # Caller already qualified these users; None = skill count unknown
+            users = [(user_id, None) for user_id in user_ids]
+        else:
+            # Get users to process with their skill counts in one grouped query
+            query = (
+                db.query(User.id, func.count(Skill.id))
+                .outerjoin(Skill, Skill.user_id == User.id)
+                .filter(User.is_active == True)
+            )
+            
+            if user_ids:
+                query = query.filter(User.id.in_(user_ids))
+            
+            users = query.group_by(User.id).all()
         logger.info(f"Found {len(users)} users to process")
         
         # Check if there are jobs available
-        job_count = db.query(Job).count()
+        job_count = get_job_count(db)
         if job_count == 0:
             logger.warning("No jobs available for matching")
             return {
@@ -45,81 +89,120 @@ def match_jobs_batch_task(user_ids: Optional[List[int]] = None):
                 "message": "No jobs available in database"
             }
         
-        # Initialize matcher
-        matcher = JobMatcher(db)
+        # Users without skills are skipped up front; the rest are matched in
+        # fixed-size chunks fanned out as a chord, so one large batch doesn't
+        # hold a single worker slot and short tasks can interleave
+        skipped = []
+        to_match = []
+        for user_id, user_skills_count in users:
+            if user_skills_count == 0:
+                logger.info(f"Skipping user {user_id} - no skills")
+                skipped.append({
+                    "user_id": user_id,
+                    "status": "skipped",
+                    "reason": "no_skills"
+                })
+            else:
+                to_match.append(user_id)
+        
+        if not to_match:
+            return summarize_matches_task([], job_count, skipped)
+        
+        chunks = [
+            to_match[i:i + MATCH_CHUNK_SIZE]
+            for i in range(0, len(to_match), MATCH_CHUNK_SIZE)
+        ]
+        summary = chord(
+            match_users_chunk_task.s(chunk) for chunk in chunks
+        )(summarize_matches_task.s(job_count, skipped))
         
-        # Process each user
+        logger.info(f"Batch matching scheduled: {len(to_match)} users in {len(chunks)} chunks")
+        return {
+            "status": "scheduled",
+            "total_users": len(users),
+            "users_skipped": len(skipped),
+            "chunks": len(chunks),
+            "job_count": job_count,
+            "summary_task_id": summary.id,
+            "processed_at": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in batch job matching: {str(e)}")
+        return {
+            "status": "error",
+            "error": str(e),
+            "processed_at": datetime.utcnow().isoformat()
+        }
+    finally:
+        TaskSession.remove()
+
+
+@celery_app.task(name="match_users_chunk")
+def match_users_chunk_task(user_ids: List[int]) -> List[Dict]:
+    """
+    Match jobs for one chunk of a batch; returns a result entry per user
+    """
+    db = TaskSession()
+    try:
+        matcher = JobMatcher(db)
+        # every user in the chunk scores against the same job list
+        matcher.prefetch_jobs()
         results = []
-        successful_matches = 0
-        failed_matches = 0
         
-        for user in users:
+        for user_id in user_ids:
             try:
-                # Skip users without skills
-                from app.db.models import Skill
-                user_skills_count = db.query(Skill).filter(
-                    Skill.user_id == user.id
-                ).count()
-                
-                if user_skills_count == 0:
-                    logger.info(f"Skipping user {user.id} - no skills")
-                    results.append({
-                        "user_id": user.id,
-                        "status": "skipped",
-                        "reason": "no_skills"
-                    })
-                    continue
-                
-                # Run matching
-                matches = matcher.match_jobs_for_user(user.id)
+                matches = matcher.match_jobs_for_user(user_id)
                 
                 results.append({
-                    "user_id": user.id,
+                    "user_id": user_id,
                     "status": "success",
                     "matches_found": len(matches),
                     "top_score": matches[0]["match_score"] if matches else 0,
                     "top_match": matches[0]["title"] if matches else None
                 })
-                successful_matches += 1
                 
-                logger.info(f"Matched {len(matches)} jobs for user {user.id}")
+                logger.info(f"Matched {len(matches)} jobs for user {user_id}")
                 
             except Exception as e:
-                logger.error(f"Error matching for user {user.id}: {str(e)}")
+                logger.error(f"Error matching for user {user_id}: {str(e)}")
+                db.rollback()
                 results.append({
-                    "user_id": user.id,
+                    "user_id": user_id,
                     "status": "failed",
                     "error": str(e)
                 })
-                failed_matches += 1
         
-        # Summary
-        summary = {
-            "status": "completed",
-            "total_users": len(users),
-            "successful_matches": successful_matches,
-            "failed_matches": failed_matches,
-            "users_skipped": len(users) - successful_matches - failed_matches,
-            "job_count": job_count,
-            "processed_at": datetime.utcnow().isoformat(),
-            "results": results
-        }
-        
-        logger.info(f"Batch matching completed: {successful_matches} successful, {failed_matches} failed")
-        return summary
+        return results
         
-    except Exception as e:
-        logger.error(f"Error in batch job matching: {str(e)}")
-        return {
-            "status": "error",
-            "error": str(e),
-            "processed_at": datetime.utcnow().isoformat()
-        }
     finally:
-        db.close()
+        TaskSession.remove()
 
 
-@celery_app.task(name="match_single_user", bind=True)
+@celery_app.task(name="summarize_matches")
+def summarize_matches_task(chunk_results: List[List[Dict]], job_count: int, skipped: List[Dict]) -> Dict:
+    """
+    Chord callback: fold the per-chunk results into the batch summary
+    """
+    results = [entry for chunk in chunk_results for entry in chunk]
+    successful_matches = sum(1 for r in results if r["status"] == "success")
+    failed_matches = len(results) - successful_matches
+    
+    summary = {
+        "status": "completed",
+        "total_users": len(results) + len(skipped),
+        "successful_matches": successful_matches,
+        "failed_matches": failed_matches,
+        "users_skipped": len(skipped),
+        "job_count": job_count,
+        "processed_at": datetime.utcnow().isoformat(),
+        "results": skipped + results
+    }
+    
+    logger.info(f"Batch matching completed: {successful_matches} successful, {failed_matches} failed")
+    return summary
+
+@celery_app.task(name="match_single_user", bind=True, track_started=False)
 def match_single_user_task(self, user_id: int):
     """
     Match jobs for a single user (real-time)
@@ -133,23 +216,20 @@ def match_single_user_task(self, user_id: int):
     """
     logger.info(f"Starting job matching for user {user_id}")
     
-    db = SessionLocal()
+    db = TaskSession()
     try:
         # Update progress: Starting
-        self.update_state(
-            state="PROCESSING",
-            meta={"progress": 10, "message": "Initializing job matching..."}
-        )
+        report_progress(self, 10, "Initializing job matching...")
         
         # Verify user exists and has skills
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
             raise ValueError(f"User {user_id} not found")
         
-        from app.db.models import Skill
-        user_skills_count = db.query(Skill).filter(
+        # COUNT over the id column; no ORM rows or subquery wrapper
+        user_skills_count = db.query(func.count(Skill.id)).filter(
             Skill.user_id == user_id
-        ).count()
+        ).scalar()
         
         if user_skills_count == 0:
             return {
@@ -160,13 +240,10 @@ def match_single_user_task(self, user_id: int):
             }
         
         # Update progress: Loading jobs
-        self.update_state(
-            state="PROCESSING",
-            meta={"progress": 30, "message": f"Analyzing {user_skills_count} skills..."}
-        )
+        report_progress(self, 30, f"Analyzing {user_skills_count} skills...")
         
         # Check available jobs
-        job_count = db.query(Job).count()
+        job_count = get_job_count(db)
         if job_count == 0:
             return {
                 "user_id": user_id,
@@ -176,29 +253,20 @@ def match_single_user_task(self, user_id: int):
             }
         
         # Update progress: Matching
-        self.update_state(
-            state="PROCESSING",
-            meta={"progress": 50, "message": f"Matching against {job_count} jobs..."}
-        )
+        report_progress(self, 50, f"Matching against {job_count} jobs...")
         
         # Run matching
         matcher = JobMatcher(db)
         matches = matcher.match_jobs_for_user(user_id)
         
         # Update progress: Saving results
-        self.update_state(
-            state="PROCESSING",
-            meta={"progress": 80, "message": "Saving match results..."}
-        )
+        report_progress(self, 80, "Saving match results...")
         
         # Get match statistics
         stats = matcher.get_match_statistics(user_id)
         
         # Update progress: Complete
-        self.update_state(
-            state="PROCESSING",
-            meta={"progress": 100, "message": "Matching completed!"}
-        )
+        report_progress(self, 100, "Matching completed!")
         
         # Prepare top matches for response
         top_matches = []
@@ -228,7 +296,7 @@ def match_single_user_task(self, user_id: int):
         raise
         
     finally:
-        db.close()
+        TaskSession.remove()
 
 
 @celery_app.task(name="refresh_stale_matches")
@@ -242,23 +310,30 @@ def refresh_stale_matches_task(days_old: int = 7):
     Returns:
         dict: Summary of refresh operation
     """
-    db = SessionLocal()
+    # SET NX: only one run at a time; without Redis, run unguarded
+    if redis_client is not None and not redis_client.set(
+        REFRESH_STALE_LOCK_KEY, "1", nx=True, ex=REFRESH_STALE_LOCK_TTL
+    ):
+        logger.info("refresh_stale_matches already running, skipping")
+        return {"status": "skipped_locked"}
+    
+    scheduled = False
+    db = TaskSession()
     try:
-        from sqlalchemy import func
-        
         # Find users with stale matches
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
         
         # Get users whose latest match is older than cutoff
         subquery = db.query(
             Match.user_id,
-            func.max(Match.created_at).label('latest_match')
+            func.max(Match.matched_at).label('latest_match')
         ).group_by(Match.user_id).subquery()
         
         stale_users = db.query(User.id).join(
             subquery, User.id == subquery.c.user_id
         ).filter(
-            subquery.c.latest_match < cutoff_date
+            subquery.c.latest_match < cutoff_date,
+            User.is_active == True
         ).all()
         
         user_ids = [user.id for user in stale_users]
@@ -270,7 +345,8 @@ def refresh_stale_matches_task(days_old: int = 7):
             }
         
         # Schedule batch matching for these users
-        task = match_jobs_batch_task.delay(user_ids)
+        task = match_jobs_batch_task.delay(user_ids, skip_user_requery=True)
+        scheduled = True
         
         return {
             "status": "scheduled",
@@ -280,8 +356,11 @@ def refresh_stale_matches_task(days_old: int = 7):
         }
         
     finally:
-        db.close()
-
+        TaskSession.remove()
+        # After scheduling, the lock is left to expire: those users stay
+        # "stale" until the batch rewrites their matches
+        if redis_client is not None and not scheduled:
+            redis_client.delete(REFRESH_STALE_LOCK_KEY)
 
 @celery_app.task(name="match_new_jobs")
 def match_new_jobs_task(job_ids: List[int]):
@@ -295,11 +374,9 @@ def match_new_jobs_task(job_ids: List[int]):
     Returns:
         dict: Summary of matching operation
     """
-    db = SessionLocal()
+    db = TaskSession()
     try:
         # Get all active users with skills
-        from app.db.models import Skill
-        
         users_with_skills = db.query(User.id).join(
             Skill, User.id == Skill.user_id
         ).filter(
@@ -316,7 +393,7 @@ def match_new_jobs_task(job_ids: List[int]):
         
         # Run batch matching for all users
         # This will include the new jobs in matching
-        task = match_jobs_batch_task.delay(user_ids)
+        task = match_jobs_batch_task.delay(user_ids, skip_user_requery=True)
         
         return {
             "status": "scheduled",
@@ -326,4 +403,4 @@ def match_new_jobs_task(job_ids: List[int]):
         }
         
     finally:
-        db.close()
+        TaskSession.remove()
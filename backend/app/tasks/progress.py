@@ -0,0 +1,28 @@
+"""Throttled progress reporting for bound Celery tasks."""
+import time
+
+from celery import Task
+
+# Minimum seconds between intermediate progress writes to the result backend
+PROGRESS_MIN_INTERVAL = 1.0
+
+
+def report_progress(task: Task, progress: int, message: str,
+                    min_interval: float = PROGRESS_MIN_INTERVAL) -> bool:
+    """
+    Publish PROCESSING progress for the running task. Intermediate updates
+    arriving within min_interval of the previous write are dropped; the
+    final one (progress >= 100) is always written.
+
+    Returns:
+        bool: Whether the update was sent to the result backend
+    """
+    request = task.request
+    now = time.monotonic()
+    last = getattr(request, "progress_written_at", None)
+    if progress < 100 and last is not None and now - last < min_interval:
+        return False
+
+    task.update_state(state="PROCESSING", meta={"progress": progress, "message": message})
+    request.progress_written_at = now
+    return True
@@ -1,51 +1,52 @@
 from celery import Task
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.core.celery_app import celery_app
-from app.db.session import SessionLocal
+from app.db.session import TaskSession
 from app.db.models import User, Skill, TaskStatus
-# from app.services.resume_parser import ResumeParser
 from app.services import resume_parser
+from app.services.skill_extractor import clean_skills
+from app.tasks.progress import report_progress
+import csv
+import io
 import logging
 from datetime import datetime, timedelta
+from typing import List
 
 logger = logging.getLogger(__name__)
 
+# Characters of resume text kept on the user row
+RESUME_TEXT_MAX_CHARS = 5000
+
+# Above this many skills, process_resume streams them with COPY instead of INSERT
+SKILL_COPY_THRESHOLD = 200
+
+# Rows per DELETE in cleanup_old_tasks
+TASK_CLEANUP_BATCH_SIZE = 2000
+
 class CallbackTask(Task):
-    """Base task with callbacks for status tracking"""
-    def on_success(self, retval, task_id, args, kwargs):
-        """Success callback - update task status to completed"""
-        db = SessionLocal()
-        try:
-            task_status = db.query(TaskStatus).filter(
-                TaskStatus.task_id == task_id
-            ).first()
-            if task_status:
-                task_status.status = "completed"
-                task_status.result = retval
-                task_status.completed_at = datetime.utcnow()
-                db.commit()
-        except Exception as e:
-            logger.error(f"Error updating task success status: {str(e)}")
-        finally:
-            db.close()
-    
+    """
+    Base task that marks TaskStatus failed when the task raises. The
+    success status is written by the task body itself, in the same
+    transaction as its results, so no second session is opened.
+    """
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Failure callback - update task status to failed"""
-        db = SessionLocal()
+        db = TaskSession()
         try:
-            task_status = db.query(TaskStatus).filter(
-                TaskStatus.task_id == task_id
-            ).first()
-            if task_status:
-                task_status.status = "failed"
-                task_status.error = str(exc)
-                task_status.completed_at = datetime.utcnow()
-                db.commit()
+            db.query(TaskStatus).filter(TaskStatus.task_id == task_id).update({
+                "status": "failed",
+                "error": str(exc),
+                # stamped by Postgres, as naive UTC like the other columns
+                "completed_at": func.timezone("utc", func.now())
+            }, synchronize_session=False)
+            db.commit()
         except Exception as e:
             logger.error(f"Error updating task failure status: {str(e)}")
         finally:
-            db.close()
+            TaskSession.remove()
 
-@celery_app.task(base=CallbackTask, bind=True, name="process_resume")
+@celery_app.task(base=CallbackTask, bind=True, name="process_resume", track_started=False)
 def process_resume_task(self, user_id: int, file_content: bytes, filename: str):
     """
     Process resume in background
@@ -61,60 +62,38 @@ def process_resume_task(self, user_id: int, file_content: bytes, filename: str):
     """
     logger.info(f"Starting resume processing for user {user_id}, file: {filename}")
     
-    db = SessionLocal()
+    db = TaskSession()
     try:
-        # Create or update task status
-        task_status = db.query(TaskStatus).filter(
-            TaskStatus.task_id == self.request.id
-        ).first()
-        
-        if not task_status:
-            task_status = TaskStatus(
-                task_id=self.request.id,
-                user_id=user_id,
-                task_type="resume_processing",
-                status="processing"
-            )
-            db.add(task_status)
-        else:
-            task_status.status = "processing"
-        
+        # Create or update task status in one INSERT ... ON CONFLICT
+        stmt = pg_insert(TaskStatus).values(
+            task_id=self.request.id,
+            user_id=user_id,
+            task_type="resume_processing",
+            status="processing"
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["task_id"],
+            set_={"status": "processing"}
+        ))
         db.commit()
         
         # Update progress: Starting
-        self.update_state(
-            state="PROCESSING", 
-            meta={"progress": 10, "message": "Starting resume parsing..."}
-        )
-        
-        # Initialize resume parser
-        text = resume_parser.extract_text_from_pdf(file_path)   # or convert bytes to temp file first
-        skills = resume_parser.extract_skills(text, db)
-        extracted_data = {
-            "text": text,
-            "skills": skills,
-            "filename": filename
-        }
-
-        
-        # Update progress: Parsing
-        self.update_state(
-            state="PROCESSING", 
-            meta={"progress": 25, "message": "Extracting content from resume..."}
-        )
+        report_progress(self, 10, "Extracting content from resume...")
         
-        # Parse resume
+        # Parse resume: one PDF extraction and one skill scan
         try:
-            extracted_data = parser.parse_resume(file_content, filename)
+            extracted_data = resume_parser.parse_resume(file_content, filename, db)
         except Exception as e:
             logger.error(f"Resume parsing failed: {str(e)}")
             raise Exception(f"Failed to parse resume: {str(e)}")
         
+        # Skills needed the whole text; past this point only the stored
+        # preview and the length are used, so the full text isn't kept
+        extracted_data["text_length"] = len(extracted_data["text"])
+        extracted_data["text"] = extracted_data["text"][:RESUME_TEXT_MAX_CHARS]
+        
         # Update progress: Processing skills
-        self.update_state(
-            state="PROCESSING", 
-            meta={"progress": 50, "message": "Processing extracted skills..."}
-        )
+        report_progress(self, 50, "Processing extracted skills...")
         
         # Clear existing resume skills for this user
         deleted_count = db.query(Skill).filter(
@@ -124,49 +103,36 @@ def process_resume_task(self, user_id: int, file_content: bytes, filename: str):
         logger.info(f"Deleted {deleted_count} existing resume skills for user {user_id}")
         
         # Update progress: Saving skills
-        self.update_state(
-            state="PROCESSING", 
-            meta={"progress": 75, "message": "Saving skills to database..."}
-        )
+        report_progress(self, 75, "Saving skills to database...")
         
-        # Add new skills
-        skills_added = 0
+        # Add new skills in one INSERT ... SELECT over the unnested names;
+        # Postgres skips names the user already has from other sources and
+        # returns the ones it inserted. Raw hits are normalized, aliased and
+        # deduped first, so DB work scales with unique skills
+        cleaned = clean_skills(extracted_data.get("skills", []))
         skills_list = []
-        
-        for skill_name in extracted_data.get("skills", []):
-            # Clean and normalize skill name
-            skill_name_clean = skill_name.strip().lower()
-            
-            # Skip empty skills
-            if not skill_name_clean:
-                continue
-                
-            # Check if skill already exists for user (from other sources)
-            existing_skill = db.query(Skill).filter(
-                Skill.user_id == user_id,
-                Skill.name == skill_name_clean,
-                Skill.source != "resume"
-            ).first()
-            
-            if not existing_skill:
-                skill = Skill(
-                    user_id=user_id,
-                    name=skill_name_clean,
-                    source="resume",
-                    proficiency="intermediate"  # Default proficiency
+        if len(cleaned) > SKILL_COPY_THRESHOLD:
+            skills_list = _copy_resume_skills(db, user_id, cleaned)
+        elif cleaned:
+            inserted = db.execute(text("""
+                INSERT INTO skills (user_id, name, source, proficiency)
+                SELECT :uid, t.n, 'resume', 'intermediate'
+                FROM unnest(CAST(:names AS text[])) AS t(n)
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM skills s
+                    WHERE s.user_id = :uid AND s.name = t.n AND s.source <> 'resume'
                 )
-                db.add(skill)
-                skills_added += 1
-                skills_list.append(skill_name_clean)
-        
-        # Commit all skills
-        db.commit()
+                RETURNING name
+            """), {"uid": user_id, "names": cleaned})
+            skills_list = [name for (name,) in inserted]
+        skills_added = len(skills_list)
         
-        # Update progress: Complete
-        self.update_state(
-            state="PROCESSING", 
-            meta={"progress": 100, "message": "Resume processing completed!"}
-        )
+        # Also update user's resume_text if extracted
+        if extracted_data.get("text"):
+            db.query(User).filter(User.id == user_id).update(
+                {"resume_text": extracted_data["text"][:RESUME_TEXT_MAX_CHARS]},
+                synchronize_session=False
+            )
         
         # Prepare result
         result = {
@@ -174,17 +140,22 @@ def process_resume_task(self, user_id: int, file_content: bytes, filename: str):
             "skills_extracted": skills_added,
             "skills_list": skills_list[:10],  # First 10 skills for preview
             "total_skills_found": len(extracted_data.get("skills", [])),
-            "text_length": len(extracted_data.get("text", "")),
+            "text_length": extracted_data.get("text_length", len(extracted_data.get("text", ""))),
             "filename": filename,
             "processed_at": datetime.utcnow().isoformat()
         }
         
-        # Also update user's resume_text if extracted
-        if extracted_data.get("text"):
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                user.resume_text = extracted_data["text"][:5000]  # Store first 5000 chars
-                db.commit()
+        # Mark the task completed; one commit covers skills, resume text
+        # and status
+        db.query(TaskStatus).filter(TaskStatus.task_id == self.request.id).update({
+            "status": "completed",
+            "result": result,
+            "completed_at": func.timezone("utc", func.now())
+        }, synchronize_session=False)
+        db.commit()
+        
+        # Update progress: Complete
+        report_progress(self, 100, "Resume processing completed!")
         
         logger.info(f"Resume processed successfully for user {user_id}: {skills_added} skills added")
         return result
@@ -195,7 +166,38 @@ def process_resume_task(self, user_id: int, file_content: bytes, filename: str):
         raise
         
     finally:
-        db.close()
+        TaskSession.remove()
+
+
+def _copy_resume_skills(db, user_id: int, names: List[str]) -> List[str]:
+    """
+    COPY path for large skill lists: one SELECT drops names the user already
+    has from other sources, then the rest stream in through COPY FROM STDIN
+    on the session's own connection (same transaction)
+    """
+    existing = {
+        name for (name,) in db.query(Skill.name).filter(
+            Skill.user_id == user_id,
+            Skill.source != "resume",
+            Skill.name.in_(names)
+        )
+    }
+    to_insert = [name for name in names if name not in existing]
+    
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        (user_id, name, "resume", "intermediate") for name in to_insert
+    )
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY skills (user_id, name, source, proficiency) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+    return to_insert
 
 
 @celery_app.task(name="cleanup_old_tasks")
@@ -204,17 +206,27 @@ def cleanup_old_tasks():
     Periodic task to clean up old task records
     (Run daily via Celery Beat)
     """
-    db = SessionLocal()
+    db = TaskSession()
     try:
         # Delete completed/failed tasks older than 7 days
         cutoff_date = datetime.utcnow() - timedelta(days=7)
         
-        deleted_count = db.query(TaskStatus).filter(
-            TaskStatus.completed_at < cutoff_date,
-            TaskStatus.status.in_(["completed", "failed"])
-        ).delete()
+        # Delete in short batches so no single transaction holds locks on
+        # (or writes WAL for) the whole backlog
+        deleted_count = 0
+        while True:
+            deleted = db.execute(text("""
+                DELETE FROM task_status WHERE ctid IN (
+                    SELECT ctid FROM task_status
+                    WHERE status IN ('completed', 'failed') AND completed_at < :cutoff
+                    LIMIT :batch
+                )
+            """), {"cutoff": cutoff_date, "batch": TASK_CLEANUP_BATCH_SIZE}).rowcount
+            db.commit()
+            deleted_count += deleted
+            if deleted < TASK_CLEANUP_BATCH_SIZE:
+                break
         
-        db.commit()
         logger.info(f"Cleaned up {deleted_count} old task records")
         
         return {"deleted_tasks": deleted_count}
@@ -224,4 +236,4 @@ def cleanup_old_tasks():
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        TaskSession.remove()
\ No newline at end of file
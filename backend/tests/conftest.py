@@ -26,21 +26,28 @@ def event_loop():
     yield loop
     loop.close()
 
-@pytest.fixture(scope="function")
-def db() -> Generator:
-    """Create a fresh database for each test."""
+@pytest.fixture(scope="session")
+def schema() -> Generator:
+    """Create the tables once for the whole test session."""
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function")
+def db(schema) -> Generator:
+    """Run each test inside a transaction that is rolled back afterwards."""
     connection = engine.connect()
     transaction = connection.begin()
     
-    db = TestingSessionLocal(bind=connection)
+    # Tests and app code call commit(); with "create_savepoint" each commit
+    # only ends a SAVEPOINT, so the outer transaction can still roll back
+    db = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     
     yield db
     
     db.close()
     transaction.rollback()
     connection.close()
-    Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
 def client(db) -> Generator:
@@ -67,9 +74,8 @@ def test_user(db):
     user = User(
         email="test@example.com",
         hashed_password=get_password_hash("testpassword"),
-        full_name="Test User",
-        is_active=True,
-        is_verified=True
+        name="Test User",
+        is_active=True
     )
     db.add(user)
     db.commit()
@@ -0,0 +1,35 @@
+# backend/tests/test_job_matcher.py
+
+import pytest
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_candidate_jobs_match_normalized_required_skills(db, prefetch):
+    """Raw spellings that normalize to a user skill (NBSP, "&", doubled spaces) stay candidates."""
+    from app.db.models import Job, JobTypeEnum
+    from app.services.job_matcher import JobMatcher
+
+    def make_job(title, required_skills):
+        return Job(
+            title=title,
+            company="Test Company",
+            description="Role description",
+            required_skills=required_skills,
+            job_type=JobTypeEnum.FULL_TIME,
+            source="test",
+        )
+
+    nbsp = make_job("Cloud Engineer", "Google\xa0Cloud, Docker")
+    ampersand = make_job("Growth Lead", "Sales & Marketing")
+    spaces = make_job("ML Engineer", "Machine  Learning")
+    unrelated = make_job("Systems Engineer", "Rust, Embedded")
+    db.add_all([nbsp, ampersand, spaces, unrelated])
+    db.commit()
+
+    matcher = JobMatcher(db)
+    if prefetch:
+        matcher.prefetch_jobs()
+    user_skills = {"google cloud", "sales and marketing", "machine learning"}
+    candidate_ids = {job.id for job, _ in matcher._candidate_jobs(user_skills)}
+
+    assert {nbsp.id, ampersand.id, spaces.id} <= candidate_ids
+    assert unrelated.id not in candidate_ids
@@ -0,0 +1,89 @@
+# backend/tests/test_keyword_matcher.py
+
+from app.services.keyword_matcher import automaton_for, build_automaton, find_terms, terms_in_order
+
+def test_overlapping_terms_are_all_found():
+    """Overlapping terms each match; at the same start the longer term comes first."""
+    automaton = build_automaton(["machine", "learning", "machine learning"])
+    text = "machine learning engineer"
+
+    assert sorted(find_terms(automaton, text)) == [
+        (0, "machine"),
+        (0, "machine learning"),
+        (8, "learning"),
+    ]
+    assert terms_in_order(automaton, text) == ["machine learning", "machine", "learning"]
+
+def test_terms_in_order_follows_first_appearance():
+    """Terms are returned once each, in the order they first start in the text."""
+    automaton = build_automaton(["docker", "python", "aws"])
+
+    assert terms_in_order(automaton, "aws, python and docker; python on aws") == ["aws", "python", "docker"]
+
+def test_punctuated_terms_match_as_whole_words():
+    """c++ and c# match even though they end in punctuation, but not glued to other words."""
+    automaton = build_automaton(["c++", "c#"])
+
+    assert terms_in_order(automaton, "c++ and c# developer") == ["c++", "c#"]
+    assert terms_in_order(automaton, "(c++/c#)") == ["c++", "c#"]
+    assert terms_in_order(automaton, "libc++ and abc# only") == []
+
+def test_short_term_does_not_match_inside_longer_word():
+    """go is not found inside google or golang, only on its own."""
+    automaton = build_automaton(["go"])
+
+    assert terms_in_order(automaton, "google and golang") == []
+    assert terms_in_order(automaton, "google, go and golang") == ["go"]
+
+def test_limit_keeps_earliest_terms():
+    """limit returns the first N distinct terms by position."""
+    terms = ["python", "java", "go", "rust"]
+    automaton = build_automaton(terms)
+    max_len = max(map(len, terms))
+
+    assert terms_in_order(automaton, "python java go rust", limit=2, max_len=max_len) == ["python", "java"]
+
+def test_limit_stops_scanning_early():
+    """Once the first N terms are settled, the rest of the text is not scanned."""
+    terms = ["python", "java", "go", "rust"]
+    automaton = build_automaton(terms)
+
+    class CountingAutomaton:
+        """Wraps the automaton to count how many raw hits were consumed."""
+        def __init__(self):
+            self.seen = 0
+
+        def iter(self, text):
+            for hit in automaton.iter(text):
+                self.seen += 1
+                yield hit
+
+    counting = CountingAutomaton()
+    result = terms_in_order(counting, "python java go rust", limit=2, max_len=max(map(len, terms)))
+
+    assert result == ["python", "java"]
+    assert counting.seen == 3  # stopped after "go"; "rust" was never reached
+
+def test_limit_does_not_drop_longer_term_at_earlier_start():
+    """A long term ending after a shorter overlapping one still wins the first slot."""
+    terms = ["machine learning", "learning", "python"]
+    automaton = build_automaton(terms)
+
+    result = terms_in_order(automaton, "machine learning python", limit=1, max_len=max(map(len, terms)))
+
+    assert result == ["machine learning"]
+
+def test_matching_is_case_insensitive_on_lowercased_text():
+    """Vocabularies are lowercase, so callers match against the lowercased text."""
+    automaton = build_automaton(["python", "node.js"])
+    text = "Senior PYTHON / Node.JS Developer"
+
+    assert terms_in_order(automaton, text.lower()) == ["python", "node.js"]
+    assert terms_in_order(automaton, text) == []
+
+def test_empty_vocabulary_matches_nothing():
+    """An empty vocabulary builds no automaton, and scanning with it finds nothing."""
+    assert build_automaton(["", ""]) is None
+    assert automaton_for(frozenset()) is None
+    assert list(find_terms(None, "python")) == []
+    assert terms_in_order(None, "python", limit=3, max_len=6) == []
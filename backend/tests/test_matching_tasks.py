@@ -0,0 +1,51 @@
+# backend/tests/test_matching_tasks.py
+
+from datetime import datetime, timedelta
+
+def test_refresh_stale_matches_schedules_only_stale_users(db, test_user, monkeypatch):
+    """Users whose newest match is older than the cutoff are re-matched; fresh ones are left alone."""
+    from app.db.models import Job, JobTypeEnum, Match, User
+    from app.tasks import matching_tasks
+
+    fresh_user = User(email="fresh@example.com", hashed_password="x", is_active=True)
+    job = Job(
+        title="Python Developer",
+        company="Test Company",
+        description="We are looking for a Python developer",
+        job_type=JobTypeEnum.FULL_TIME,
+        source="test",
+    )
+    db.add_all([fresh_user, job])
+    db.commit()
+    db.add_all([
+        Match(user_id=test_user.id, job_id=job.id, score=0.8,
+              matched_at=datetime.utcnow() - timedelta(days=10)),
+        Match(user_id=fresh_user.id, job_id=job.id, score=0.7),
+    ])
+    db.commit()
+
+    class _FixtureSession:
+        """TaskSession stand-in handing the task the test's transaction."""
+        def __call__(self):
+            return db
+
+        def remove(self):
+            pass
+
+    scheduled = []
+
+    class _Result:
+        id = "refresh-test"
+
+    def fake_delay(user_ids, skip_user_requery=False):
+        scheduled.append(user_ids)
+        return _Result()
+
+    monkeypatch.setattr(matching_tasks, "TaskSession", _FixtureSession())
+    monkeypatch.setattr(matching_tasks, "redis_client", None)
+    monkeypatch.setattr(matching_tasks.match_jobs_batch_task, "delay", fake_delay)
+
+    result = matching_tasks.refresh_stale_matches_task(days_old=7)
+
+    assert result["status"] == "scheduled"
+    assert scheduled == [[test_user.id]]
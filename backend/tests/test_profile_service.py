@@ -0,0 +1,34 @@
+# backend/tests/test_profile_service.py
+
+from sqlalchemy import func
+
+def test_add_skills_links_seeded_skill_case_insensitively(db, test_user):
+    """A profile skill resolves to the seeded SkillMaster row instead of adding a lowercase copy."""
+    from app.db.models import SkillMaster
+    from app.services.profile_service import ProfileService
+
+    seeded = SkillMaster(name="Python", category="language", source="seed", is_verified=True)
+    db.add(seeded)
+    db.commit()
+    before = db.query(func.count(SkillMaster.id)).scalar()
+
+    profile = ProfileService.add_skills(db, test_user.id, ["Python", " python "])
+
+    assert db.query(func.count(SkillMaster.id)).scalar() == before
+    assert ProfileService.get_skill_names(db, profile.id) == ["Python"]
+
+def test_add_skills_keeps_unknown_names_out_of_vocabulary(db, test_user):
+    """Free-text profile skills are stored as unverified profile rows the extractors skip."""
+    from app.db.models import SkillMaster
+    from app.services.profile_service import ProfileService
+    from app.services.skill_extractor import invalidate_skills_cache, load_dynamic_skills
+
+    profile = ProfileService.add_skills(db, test_user.id, ["Underwater Basket Weaving"])
+
+    row = db.query(SkillMaster).filter(SkillMaster.name == "underwater basket weaving").one()
+    assert row.source == "profile"
+    assert row.is_verified is False
+    assert ProfileService.get_skill_names(db, profile.id) == ["underwater basket weaving"]
+
+    invalidate_skills_cache()
+    assert "underwater basket weaving" not in load_dynamic_skills(db)